@@ -0,0 +1,164 @@
+import gzip
+import os
+import pickle
+import tempfile
+import time
+
+class SnapshotPickler(pickle.Pickler):
+    """
+    A pickler that leaves out the times of the workload, which every process
+    shares and which can be generated again from the arguments
+    """
+
+    def __init__(self, f, times):
+        """
+        @param f: the binary file object to write to
+        @param times: the times of the workload, None if there are none
+        """
+        super().__init__(f, pickle.HIGHEST_PROTOCOL)
+        self.times = times
+
+    def persistent_id(self, obj):
+        if self.times is not None and obj is self.times:
+            return 'times'
+        return None
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """
+    An unpickler that puts the times of the workload back
+    """
+
+    def __init__(self, f, times):
+        """
+        @param f: the binary file object to read from
+        @param times: the times of the workload generated again
+        """
+        super().__init__(f)
+        self.times = times
+
+    def persistent_load(self, pid):
+        if pid != 'times' or self.times is None:
+            raise pickle.UnpicklingError('the snapshot needs the times of its workload')
+        return self.times
+
+class Checkpoint:
+    """
+    A Checkpoint class that writes snapshots of a run of all algorithms, so
+    that an interrupted run can be resumed. A snapshot holds the arguments,
+    the metrics of the algorithms that are done, and the state of the loop of
+    the algorithm being simulated, without the processes that haven't arrived
+    yet or the times of the workload
+    """
+
+    def __init__(self, path, interval, args, sink, times):
+        """
+        @param path: path of the snapshot
+        @param interval: seconds between two snapshots
+        @param args: a NameSpace containing all argument values
+        @param sink: the Sink of the event log, flushed before every snapshot
+        @param times: the times of the workload, None if there are none
+        """
+        self.path = path
+        self.interval = interval
+        self.args = args
+        self.sink = sink
+        self.times = times
+        self.last = time.monotonic()
+
+        # The algorithm being simulated, and the metrics of the algorithms
+        # that are done, in order
+        self.algorithm = None
+        self.done = {}
+
+        # The state of the loop to resume from, taken by the simulation
+        self.state = None
+
+        # Number of characters of the event log written before this run, if
+        # it was resumed
+        self.emitted = 0
+
+    def resume(self, snapshot):
+        """
+        A method to continue a run from a snapshot
+        @param snapshot: dict of the snapshot, as returned by load()
+        """
+        self.done = dict(snapshot['done'])
+        self.algorithm = snapshot['algorithm']
+        self.state = snapshot['state']
+        self.emitted = snapshot['emitted']
+        self.sink.restore(snapshot['sink'])
+
+    def start(self, algorithm):
+        """
+        A method to be called when an algorithm starts
+        @param algorithm: name of the algorithm
+        """
+        if algorithm != self.algorithm:
+            self.state = None
+        self.algorithm = algorithm
+
+    def finish(self, algorithm, metrics):
+        """
+        A method to be called when an algorithm is done
+        @param algorithm: name of the algorithm
+        @param metrics: dict of the metrics of the algorithm
+        """
+        self.done[algorithm] = metrics
+
+    def save(self, state):
+        """
+        A method to write a snapshot, if the last one is older than the
+        interval
+        @param state: dict of the state of the loop
+        """
+        if time.monotonic() - self.last < self.interval:
+            return
+        self.write(state)
+        self.last = time.monotonic()
+
+    def write(self, state):
+        """
+        A method to write a snapshot. It's written to a temporary file and
+        renamed, so an interruption never leaves half of a snapshot
+        @param state: dict of the state of the loop
+        """
+        # The event log up to the snapshot is written out, so that the
+        # snapshot knows how much of it there is
+        self.sink.flush()
+        header = {'args': self.args, 'algorithm': self.algorithm, 'done': self.done,
+                  'emitted': self.emitted + self.sink.written, 'sink': self.sink.snapshot()}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1) as f:
+                pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+                SnapshotPickler(f, self.times).dump(state)
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def remove(self):
+        """
+        A method to remove the snapshot once the run is complete
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def load(path, workload_times):
+    """
+    A method to read a snapshot
+    @param path: path of the snapshot
+    @param workload_times: function of the arguments of the snapshot that
+    returns the times of their workload, or None if there are none
+    @return snapshot: dict of the arguments, the algorithm being simulated,
+    the metrics of the algorithms that are done, the number of characters of
+    the event log before the snapshot, the state of the sink and the state of
+    the loop
+    """
+    with gzip.open(path, 'rb') as f:
+        snapshot = pickle.load(f)
+        snapshot['state'] = SnapshotUnpickler(f, workload_times(snapshot['args'])).load()
+    return snapshot
@@ -0,0 +1,113 @@
+import math
+
+class Histogram:
+    """
+    A Histogram class to record integer times, e.g. wait times, one at a time
+    and get their percentiles without keeping every time. Like an HDR
+    histogram, times below 2 ** (precision + 1) are counted exactly, and
+    larger ones in buckets no wider than 1 / 2 ** precision of the times in
+    them, so memory only grows with the logarithm of the largest time
+    """
+
+    __slots__ = ('precision', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, precision=7):
+        """
+        @param precision: number of bits of every time that are kept. The
+        default keeps percentiles within 1% of the exact ones
+        """
+        self.precision = precision
+
+        # Number of times in every bucket, indexed by index()
+        self.counts = []
+
+        # The count, sum, minimum and maximum of the times are kept exactly
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def index(self, value):
+        """
+        A method to get the bucket of a time. A time of 2 ** (precision + s)
+        or more, up to 2 ** (precision + s + 1), is in a bucket of width 2 ** s
+        @param value: the time, at least 0
+        @return index: index of the bucket
+        """
+        shift = value.bit_length() - self.precision - 1
+        if shift <= 0:
+            return value
+        return (shift << self.precision) + (value >> shift)
+
+    def bucket(self, index):
+        """
+        A method to get the times in a bucket
+        @param index: index of the bucket
+        @return low, width: the lowest time in the bucket and the number of
+        times in it
+        """
+        if index < 2 << self.precision:
+            return index, 1
+        shift = (index >> self.precision) - 1
+        return (index - (shift << self.precision)) << shift, 1 << shift
+
+    def record(self, value):
+        """
+        A method to record a time
+        @param value: the time, at least 0
+        """
+        value = int(value)
+        i = self.index(value)
+        if i >= len(self.counts):
+            self.counts.extend([0] * (i + 1 - len(self.counts)))
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        A method to add the times recorded by another histogram of the same
+        precision
+        @param other: the Histogram
+        """
+        if other.precision != self.precision:
+            raise ValueError('cannot merge histograms of different precisions')
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, q):
+        """
+        A method to get a percentile of the times, by the nearest rank. The
+        middle of the bucket of that rank is returned, which is exact for
+        small times
+        @param q: the percentile, from 0 to 100
+        @return value: the percentile, or 0 if no time was recorded
+        """
+        if self.count == 0:
+            return 0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                low, width = self.bucket(i)
+                return min(max(low + (width - 1) / 2, self.min), self.max)
+        return self.max
+
+    def mean(self):
+        """
+        A method to get the average of the times
+        @return mean: the average, or 0 if no time was recorded
+        """
+        return self.total / self.count if self.count else 0
@@ -1,29 +1,74 @@
-from Rand48 import Rand48
-import copy
-
 class Process:
     """
-    A Process class to represent a process
+    A Process class to represent the state of a process during one
+    simulation. The CPU burst and IO times are only read, so every simulation
+    of the same workload shares them
     """
 
-    def __init__(self, name, arrival, num_bursts, timelist,tau):
+    __slots__ = ('pid', 'name', 'arrival', 'num_bursts', 'timelist', 'position',
+                 'remaining', 'cpu_time', 'tau', 'wait', 'queued', 'ready', 'cpu',
+                 'bursts', 'total_wait', 'response', 'preemptions')
+
+    def __init__(self, pid, name, arrival, num_bursts, timelist, tau, offset=0):
         """
-        @param name: the name of the process, A-Z
+        @param pid: the id of the process. Ties between processes are broken by
+        their ids
+        @param name: the name of the process, e.g. A-Z
         @param arrival: the arrival time of the process
         @num_bursts: the total number of CPU bursts for the process
-        @timelist: a list of times of CPU bursts and IO. Note that these two
+        @timelist: a sequence of times of CPU bursts and IO. Note that these two
         times are interleaved, i.e. timelist = [tcpu, tio, tcpu, tio, tcpu...],
-        and the last number is always cpu time, 
+        and the last number is always cpu time,
         and len(timelist) == 2 * num_bursts - 1
+        @tau: the initial estimate of the CPU burst time
+        @offset: index in timelist where the times of this process start, for
+        a timelist that holds the times of many processes
         """
 
+        self.pid = pid
         self.name = name
         self.arrival = arrival
         self.num_bursts = num_bursts
         self.timelist = timelist
         self.cpu_time = 0
         self.tau=tau
-        self.wait = []
+
+        # The time the current CPU burst joined a ready queue after arrival or
+        # IO, and the time it has waited on ready queues since, including
+        # after preemptions
+        self.queued = None
+        self.wait = 0
+
+        # For the summary of the process: its number of bursts, the wait time
+        # of its completed bursts, the time until its first burst started,
+        # None before that, and the number of times it was preempted
+        self.bursts = num_bursts
+        self.total_wait = 0
+        self.response = None
+        self.preemptions = 0
+
+        # The time the process was last put on a ready queue. Its wait time
+        # is added when it leaves the queue
+        self.ready = None
+
+        # Id of the CPU the process last ran on, None before it first runs
+        self.cpu = None
+
+        # Index in timelist of the CPU burst or IO the process is doing, and
+        # the time left of it
+        self.position = offset
+        self.remaining = timelist[offset]
+
+    def advance(self):
+        """
+        Method to move on to the next CPU burst or IO once the current one is
+        done. The remaining time is 0 once the last CPU burst is done
+        """
+        self.position += 1
+        if self.num_bursts > 0:
+            self.remaining = self.timelist[self.position]
+        else:
+            self.remaining = 0
 
     def __str__(self):
         """
@@ -34,10 +79,9 @@ class Process:
 
     def __lt__(self, value):
         """
-        Method to compare two processes by their name. Useful for sorting a list
+        Method to compare two processes by their id. Useful for sorting a list
         of processes
         @param value: the rhs of the comparison
-        @return comp: whether the name of the process occurs alphabetically
-        before value.name
+        @return comp: whether the id of the process is less than value.pid
         """
-        return self.name < value.name
\ No newline at end of file
+        return self.pid < value.pid
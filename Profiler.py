@@ -0,0 +1,91 @@
+from Sink import Sink
+from time import perf_counter
+
+# The phases of the simulation loop, in the order they run at every event
+# time. Wait accounting is part of dispatch, and logging is part of every
+# phase that emits events
+PHASES = ['next_event', 'burst', 'switch_in', 'requeue', 'io', 'arrival', 'switch_out', 'dispatch', 'wait', 'end_check', 'logging']
+
+# The phases whose time is also counted in other phases
+NESTED = {'wait': 'dispatch', 'logging': 'every phase'}
+
+class Profiler:
+    """
+    A Profiler class that counts and times the phases of the simulation loop
+    of one algorithm. It's only plain numbers, so it can be sent back from a
+    worker process
+    """
+
+    def __init__(self):
+        # Number of items every phase handled, e.g. IO completions, and the
+        # time spent in it
+        self.counts = dict.fromkeys(PHASES, 0)
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+
+        # Time spent in the whole loop, the number of event times and the
+        # simulated time
+        self.total = 0.0
+        self.events = 0
+        self.ticks = 0
+
+    def lap(self, phase, start):
+        """
+        A method to add the time since start to a phase
+        @param phase: the phase, one of PHASES
+        @param start: the perf_counter() when the phase started
+        @return now: the perf_counter() now, i.e. the start of the next phase
+        """
+        now = perf_counter()
+        self.seconds[phase] += now - start
+        return now
+
+    def sink(self, sink):
+        """
+        A method to wrap a sink so that the time spent logging, including
+        formatting the ready queues, is counted
+        @param sink: the Sink that the events are emitted to
+        @return sink: the TimedSink
+        """
+        return TimedSink(sink, self)
+
+    def report(self, algorithm):
+        """
+        A method to format the breakdown of the loop
+        @param algorithm: name of the algorithm
+        @return data: the breakdown
+        """
+        data = 'Profile {}: {} events, {} ticks, {:.1f} ticks/event, {:.3f} s in the loop\n'.format(
+            algorithm, self.events, self.ticks, self.ticks / max(self.events, 1), self.total)
+        for phase in PHASES:
+            seconds = self.seconds[phase]
+            data += '-- {:<10} {:>10} items {:>11.3f} ms {:>6.1f}% {:>9.3f} us/item{}\n'.format(
+                phase, self.counts[phase], seconds * 1e3, seconds / self.total * 100 if self.total else 0,
+                seconds / self.counts[phase] * 1e6 if self.counts[phase] else 0,
+                ' (in {})'.format(NESTED[phase]) if phase in NESTED else '')
+        return data
+
+class TimedSink(Sink):
+    """
+    A sink that passes every event on to another sink, counting and timing the
+    events for a Profiler
+    """
+
+    def __init__(self, sink, profiler):
+        """
+        @param sink: the Sink that the events are passed on to
+        @param profiler: the Profiler
+        """
+        self.sink = sink
+        self.profiler = profiler
+
+    def emit(self, clock, kind, queue, **fields):
+        start = perf_counter()
+        self.sink.emit(clock, kind, queue, **fields)
+        self.profiler.counts['logging'] += 1
+        self.profiler.lap('logging', start)
+
+    def flush(self):
+        self.sink.flush()
+
+    def close(self):
+        self.sink.close()
@@ -1,5 +1,5 @@
+from collections import deque
 import heapq
-import copy
 class Queue():
     """
     A Queue class that has a mode for different types of queue. Overrides 
@@ -14,7 +14,17 @@ class Queue():
         for LIFO queue (used in RR when rradd is Precedence.BEGINNING)
         """
         self.mode = mode
-        self.container = []
+
+        # FIFO and LIFO queues are backed by a deque, so that popping from
+        # either end is O(1). The priority queue is a heap on a list
+        if self.mode == 'queue' or self.mode == 'stack':
+            self.container = deque()
+        else:
+            self.container = []
+
+        # Cached string representation of the queue. It is rebuilt only when
+        # the queue has changed since the last time it was printed
+        self.rendered = None
 
     def push(self, obj):
         """
@@ -23,6 +33,7 @@ class Queue():
         just the object
         @param obj: the object to be pushed into the queue
         """
+        self.rendered = None
         if self.mode == 'queue' or self.mode == 'stack':
             self.container.append(obj)
         elif self.mode == 'pq':
@@ -34,8 +45,9 @@ class Queue():
         the queue.
         @return obj: object that is popped from the queue
         """
+        self.rendered = None
         if self.mode == 'queue':
-            return self.container.pop(0)
+            return self.container.popleft()
         if self.mode == 'pq':
             return heapq.heappop(self.container)
         if self.mode == 'stack':
@@ -46,20 +58,24 @@ class Queue():
         Method to print the queue
         @return str: the string representation of the queue
         """
-        if len(self) == 0:
-            return '[Q <empty>]'
-        s = '[Q'
-        for x in self:
-            if self.mode == 'queue' or self.mode == 'stack':
-                s += ' ' + str(x)
-            elif self.mode == 'pq':
-                #s += ' ' + str(x[1])
-                break
-        if (self.mode == 'pq'):
-            temp = copy.deepcopy(self.container)
-            while (temp):
-                s += ' ' + str(heapq.heappop(temp)[1])
-        return s + ']'
+        if self.rendered is None:
+            if len(self) == 0:
+                self.rendered = '[Q <empty>]'
+            else:
+                self.rendered = '[Q ' + ' '.join(self.names()) + ']'
+        return self.rendered
+
+    def names(self):
+        """
+        Method to get the names of the queued processes in the order they are
+        printed
+        @return names: list of the names
+        """
+        if self.mode == 'pq':
+            # The heap isn't stored in pop order. Sorting the (priority,
+            # Process) tuples gives that order without copying any Process
+            return [str(x[1]) for x in sorted(self.container)]
+        return [str(x) for x in self.container]
 
     def __len__(self):
         """
@@ -1,5 +1,18 @@
+from bisect import bisect_left
+import copy
 import math
 
+# NumPy is only needed to generate numbers in blocks
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Parameters of the linear congruential generator X = (A * X + C) mod M
+MULTIPLIER = 0x5DEECE66D
+INCREMENT = 0xB
+MASK = 2 ** 48 - 1
+
 class Rand48:
     """
     Random number generator mimicking the 48-bit linear congruential algorithm
@@ -15,16 +28,23 @@ class Rand48:
         exponential distribution
         """
         self.seed = seed
-        self.X = (self.seed << 16) + 0x330E
+
+        # The state is kept reduced mod 2^48, so a negative seed or one of 2^32
+        # or more gives the same numbers as in C, and fits a NumPy uint64
+        self.X = ((self.seed << 16) + 0x330E) & MASK
         self.lam = lam
         self.tail = tail
+
+        # Number of uniform numbers drawn since seeding
+        self.position = 0
     
     def drand48(self):
         """
         Method to generate uniform distribution between [0, 1)
         @return r: a random number between [0, 1)
         """
-        self.X = (0x5DEECE66D * self.X + 0xB) % 2 ** 48
+        self.X = (MULTIPLIER * self.X + INCREMENT) & MASK
+        self.position += 1
         return self.X / 2 ** 48
     
     def next_exp(self):
@@ -37,4 +57,195 @@ class Rand48:
             rt = -math.log(self.drand48()) / self.lam
             if rt <= self.tail:
                 break
-        return rt
\ No newline at end of file
+        return rt
+
+    def block(self, k):
+        """
+        Method to generate the next k states of the generator at once. State
+        i of the block is A_i * X + C_i mod 2^48, where A_i and C_i are the
+        multiplier and increment of i steps. In uint64 the products wrap
+        around mod 2^64, and 2^48 divides 2^64, so masking gives them exactly
+        @param k: number of states
+        @return states: NumPy uint64 array of the next k values of X
+        """
+        multipliers, increments = step_table(k)
+        states = (multipliers * numpy.uint64(self.X) + increments) & numpy.uint64(MASK)
+        self.X = int(states[-1])
+        self.position += k
+        return states
+
+    def jump(self, k):
+        """
+        Method to skip the next k uniform numbers in O(log k) steps, leaving the
+        generator exactly where k calls of drand48 would
+        @param k: number of numbers to skip
+        """
+        multiplier, increment = step_coefficients(k)
+        self.X = (multiplier * self.X + increment) & MASK
+        self.position += k
+
+    def substream(self, start):
+        """
+        Method to get an independent generator that starts start numbers after
+        this one. This generator is not changed
+        @param start: number of uniform numbers between the two generators
+        @return rand: the new Rand48
+        """
+        rand = copy.copy(self)
+        rand.jump(start)
+        return rand
+
+    def split(self, lengths):
+        """
+        Method to split the stream ahead of this generator into consecutive
+        substreams, e.g. one per worker. Drawing lengths[i] numbers from
+        substream i, for every i in order, draws exactly the same numbers as
+        this generator would
+        @param lengths: number of uniform numbers in each substream
+        @return rands: list of Rand48, one per substream
+        """
+        rands = []
+        start = 0
+        for length in lengths:
+            rands.append(self.substream(start))
+            start += length
+        return rands
+
+def step_coefficients(k):
+    """
+    A method to get the multiplier A_k and increment C_k of k steps of the
+    generator, i.e. k steps take X to A_k * X + C_k mod 2^48. Steps compose
+    as affine maps, so they are found by squaring the one step map
+    @param k: number of steps
+    @return multiplier, increment: A_k and C_k
+    """
+    multiplier, increment = 1, 0
+    square_multiplier, square_increment = MULTIPLIER, INCREMENT
+    while k:
+        if k & 1:
+            multiplier = (square_multiplier * multiplier) & MASK
+            increment = (square_multiplier * increment + square_increment) & MASK
+        square_increment = (square_multiplier * square_increment + square_increment) & MASK
+        square_multiplier = (square_multiplier * square_multiplier) & MASK
+        k >>= 1
+    return multiplier, increment
+
+# Multipliers and increments of 1..k steps, for the largest k asked for so far
+_step_table = (None, None)
+
+def step_table(k):
+    """
+    A method to get the multipliers A_i and increments C_i of i = 1..k steps
+    of the generator. The table is doubled from the one step generator: the
+    steps m + 1..2m are the first m steps followed by one of the steps 1..m
+    @param k: number of steps
+    @return multipliers, increments: NumPy uint64 arrays of length k
+    """
+    global _step_table
+    multipliers, increments = _step_table
+    if multipliers is None or len(multipliers) < k:
+        multipliers = numpy.array([MULTIPLIER], dtype=numpy.uint64)
+        increments = numpy.array([INCREMENT], dtype=numpy.uint64)
+        mask = numpy.uint64(MASK)
+        while len(multipliers) < k:
+            last_multiplier, last_increment = multipliers[-1], increments[-1]
+            multipliers = numpy.concatenate((multipliers, (multipliers * last_multiplier) & mask))
+            increments = numpy.concatenate((increments, (multipliers[:len(increments)] * last_increment + increments) & mask))
+        _step_table = (multipliers, increments)
+    return multipliers[:k], increments[:k]
+
+class Rand48Stream:
+    """
+    A Rand48Stream class that draws exactly the same numbers as the Rand48 it
+    wraps, but generates them in blocks with NumPy. The exponential numbers
+    and the rejection against the tail are computed for a whole block at once
+    """
+
+    def __init__(self, rand, block=1 << 16):
+        """
+        @param rand: the Rand48 to draw from. Call sync() when done to leave it
+        in the state it would be in after drawing the same numbers itself
+        @param block: number of states generated at once
+        """
+        self.rand = rand
+        self.block = block
+
+        # The generated states, their uniform and exponential numbers, and the
+        # indices of the exponential numbers that are not cut off by the tail
+        self.states = numpy.empty(0, dtype=numpy.uint64)
+        self.uniform = numpy.empty(0)
+        self.exp = numpy.empty(0)
+        self.accepted = numpy.empty(0, dtype=numpy.int64)
+
+        # The same indices as a list, which is much faster to bisect
+        self.accepted_list = []
+
+        # Index of the next state to be drawn, and the position in the wrapped
+        # Rand48 of the first state kept
+        self.position = 0
+        self.first = rand.position
+
+    def extend(self):
+        """
+        Method to generate another block, dropping the states already drawn
+        """
+        states = self.rand.block(self.block)
+        uniform = states / float(2 ** 48)
+        with numpy.errstate(divide='ignore'):
+            exp = -numpy.log(uniform) / self.rand.lam
+
+        # numpy.log can be a few ulps off math.log. That only matters where a
+        # number is about to be rounded to an integer or compared against the
+        # tail, so those are computed again with math.log
+        nearest = numpy.rint(exp)
+        suspect = (numpy.abs(exp - nearest) <= 1e-9 * numpy.maximum(nearest, 1)) | \
+                  (numpy.abs(exp - self.rand.tail) <= 1e-9 * max(self.rand.tail, 1))
+        for i in numpy.flatnonzero(suspect):
+            exp[i] = -math.log(uniform[i]) / self.rand.lam
+
+        self.first += self.position
+        keep = slice(self.position, None)
+        self.states = numpy.concatenate((self.states[keep], states))
+        self.uniform = numpy.concatenate((self.uniform[keep], uniform))
+        self.exp = numpy.concatenate((self.exp[keep], exp))
+        self.accepted = numpy.flatnonzero(self.exp <= self.rand.tail)
+        self.accepted_list = self.accepted.tolist()
+        self.position = 0
+
+    def drand48(self):
+        """
+        Method to draw a uniform number, like Rand48.drand48
+        @return r: a random number between [0, 1)
+        """
+        if self.position >= len(self.states):
+            self.extend()
+        self.position += 1
+        return float(self.uniform[self.position - 1])
+
+    def next_exps(self, k):
+        """
+        Method to draw k exponential numbers, like k calls of Rand48.next_exp
+        @param k: number of numbers
+        @return rt: NumPy array of the k numbers
+        """
+        first = bisect_left(self.accepted_list, self.position)
+        while len(self.accepted_list) - first < k:
+            self.extend()
+            first = bisect_left(self.accepted_list, self.position)
+        self.position = self.accepted_list[first + k - 1] + 1
+        return self.exp[self.accepted[first:first + k]]
+
+    def next_exp(self):
+        """
+        Method to draw an exponential number, like Rand48.next_exp
+        @return rt: random number generated from the exponential distribution
+        """
+        return float(self.next_exps(1)[0])
+
+    def sync(self):
+        """
+        Method to put the wrapped Rand48 in the state after the last draw
+        """
+        if self.position > 0:
+            self.rand.X = int(self.states[self.position - 1])
+            self.rand.position = self.first + self.position
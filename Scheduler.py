@@ -0,0 +1,976 @@
+from Checkpoint import SnapshotPickler, SnapshotUnpickler
+from Histogram import Histogram
+from Queue import Queue
+from Sink import NullSink
+from time import perf_counter
+import heapq
+import io
+import itertools
+import math
+
+# The percentiles of the wait, turnaround and response times in the metrics
+PERCENTILES = (50, 90, 95, 99)
+
+# Number of event times between two offers of the state of the loop to a
+# checkpoint
+CHECKPOINT_STEPS = 1024
+
+def next_event(events, clock, *wakeups):
+    """
+    A method to get the time of the next event from the future-event list and
+    the wake-up heaps. Events at or before the current clock have already been
+    handled and are discarded.
+    @param events: the future-event list, a heap of (event time, CPU id)
+    @param clock: the current time
+    @param wakeups: heaps of (wake-up time, id, process), i.e. the processes
+    doing IO and the processes that haven't arrived yet
+    @return time: the time of the next event, or clock + 1 if no event is
+    pending
+    """
+    while events and events[0][0] <= clock:
+        heapq.heappop(events)
+    times = [heap[0][0] for heap in wakeups if heap]
+    if events:
+        times.append(events[0][0])
+    if not times:
+        return clock + 1
+    return min(times)
+
+def tau_function(process,alpha):
+    tau=math.ceil((1-alpha)*process.tau+alpha*process.cpu_time)
+    return int(tau)
+
+class Policy():
+    """
+    A Policy class that decides how the processes are scheduled by schedule().
+    The engine does the context switches, IO and bookkeeping, and asks the
+    policy which process runs next and whether it is preempted. This policy is
+    FCFS; the other algorithms override the methods they need
+    """
+
+    # Name of the algorithm in the event log and in simout
+    name = 'FCFS'
+
+    # Mode of the ready queue, see Queue
+    queue_mode = 'queue'
+
+    # Time slice of a burst, or None if a burst is never sliced. When the time
+    # slice expires and the ready queue isn't empty, the process is preempted
+    tslice = None
+
+    # Whether should_preempt can ever return True. If not, the engine doesn't
+    # ask it
+    preemptive = False
+
+    def on_new(self, process):
+        """
+        A method called once for every process before the simulation starts
+        @param process: the Process
+        """
+        pass
+
+    def on_ready(self, queue, process):
+        """
+        A method to put a process on the ready queue, i.e. when it arrives,
+        completes IO or has been preempted
+        @param queue: the ready Queue
+        @param process: the Process
+        """
+        queue.push(process)
+
+    def select_next(self, queue):
+        """
+        A method to take the process that runs next off the ready queue. It is
+        only called if the queue isn't empty
+        @param queue: the ready Queue
+        @return process: the Process
+        """
+        return queue.pop()
+
+    def should_preempt(self, running, ready):
+        """
+        A method to decide whether a process that has just completed IO
+        preempts the running process. Arrivals never preempt
+        @param running: the Process using the CPU
+        @param ready: the Process that has completed IO
+        @return preempt: whether the running process is preempted
+        """
+        return False
+
+    def on_burst_complete(self, process):
+        """
+        A method called when a process completes a CPU burst that isn't its
+        last one, before its cpu_time is reset
+        @param process: the Process
+        @return tau: the new estimate of the burst time of the process, or None
+        if the policy doesn't estimate it
+        """
+        return None
+
+    def start_kind(self, process):
+        """
+        A method to get the kind of the event logged when a process starts
+        using the CPU
+        @param process: the Process
+        @return kind: 'burst_start' or 'burst_resume'
+        """
+        return 'burst_start' if process.cpu_time == 0 else 'burst_resume'
+
+    def fields(self, process):
+        """
+        A method to get the details of a process that are logged along with
+        its name, e.g. its tau
+        @param process: the Process
+        @return fields: dict of the details
+        """
+        return {}
+
+    def start_fields(self):
+        """
+        A method to get the details logged when the simulation starts
+        @return fields: dict of the details
+        """
+        return {}
+
+    def diverges(self, cpu, until, variants):
+        """
+        A method to decide whether variants of the policy, i.e. policies of the
+        same class that only differ in their parameters, may act differently
+        from this one on a CPU at the next event time. As long as none of them
+        does, the state of the loop is the same for all of them. FCFS has no
+        parameters
+        @param cpu: the CPU
+        @param until: the next event time
+        @param variants: list of the other Policies
+        @return diverges: whether they may act differently
+        """
+        return False
+
+class SJFPolicy(Policy):
+    """
+    The SJF policy. The ready queue is ordered by the estimated burst times,
+    which are recalculated by exponential averaging after every burst
+    """
+
+    name = 'SJF'
+    queue_mode = 'pq'
+
+    def __init__(self, lamb, alpha, tau=None):
+        """
+        @param lamb: the lambda of the workload. The initial tau is 1 / lamb
+        @param alpha: constant for exponential averaging
+        @param tau: the initial tau, e.g. the one of a Workload, instead of
+        1 / lamb. lamb isn't used then
+        """
+        self.tau = int(1/lamb if tau is None else tau)
+        self.alpha = alpha
+
+    def on_new(self, process):
+        process.tau = self.tau
+
+    def on_ready(self, queue, process):
+        # A preempted process is queued by the time left of its estimate
+        queue.push((process.tau - process.cpu_time, process))
+
+    def select_next(self, queue):
+        return queue.pop()[1]
+
+    def on_burst_complete(self, process):
+        process.tau = tau_function(process, self.alpha)
+        return process.tau
+
+    def fields(self, process):
+        return {'tau': process.tau}
+
+    def diverges(self, cpu, until, variants):
+        # The estimates only differ once a burst that isn't the last one of
+        # its process completes
+        bursting = cpu.bursting
+        return bursting is not None and not cpu.switch_in and cpu.burst_end == until and bursting.num_bursts > 1
+
+class SRTPolicy(SJFPolicy):
+    """
+    The SRT policy. Like SJF, but a process that completes IO preempts the
+    running process if its estimate is less than the time left of the
+    estimate of the running process
+    """
+
+    name = 'SRT'
+    preemptive = True
+
+    def should_preempt(self, running, ready):
+        return running.tau - running.cpu_time > ready.tau
+
+    def start_kind(self, process):
+        return 'burst_resume'
+
+class RRPolicy(Policy):
+    """
+    The RR policy. Processes are preempted when their time slice expires, and
+    are added to either end of the ready queue
+    """
+
+    name = 'RR'
+
+    def __init__(self, tslice, rradd='END'):
+        """
+        @param tslice: the time slice
+        @param rradd: 'END' or 'BEGINNING', the end of the ready queue that
+        processes are added to
+        """
+        self.tslice = tslice
+        self.rradd = rradd
+        self.queue_mode = 'queue' if rradd == 'END' else 'stack'
+
+    def start_fields(self):
+        return {'tslice': int(self.tslice), 'rradd': self.rradd}
+
+    def diverges(self, cpu, until, variants):
+        # A time slice only expires in a burst longer than it, so nothing
+        # differs until such a burst is switched in
+        return cpu.switch_in and cpu.bursting.remaining > min(policy.tslice for policy in [self] + variants)
+
+class CPU():
+    """
+    A CPU class to hold the state of one CPU during a simulation: the process
+    using it, its context switch and its time slice. The state only changes at
+    the times kept here, so a CPU is only looked at when one of them is due
+    """
+
+    __slots__ = ('id', 'queue', 'tag', 'bursting', 'switch_in', 'switch_out', 'switch_at',
+                 'to_io', 'preempt_flag', 'finished_io', 'ts', 'started', 'base', 'burst_end',
+                 'slice_end', 'busy')
+
+    def __init__(self, cid, queue, tag, tslice):
+        """
+        @param cid: the id of the CPU, starting from 0
+        @param queue: the ready Queue the CPU takes its processes from
+        @param tag: the fields that identify the CPU in its events, empty if
+        there is only one CPU
+        @param tslice: the time slice, None if bursts are never sliced
+        """
+        self.id = cid
+        self.queue = queue
+        self.tag = tag
+
+        # Current bursting process. If the CPU is idle, this variable is set to
+        # None
+        self.bursting = None
+
+        # Indicates whether the CPU is doing the first half of the context
+        # switch
+        self.switch_in = False
+
+        # Indicates whether the CPU is doing the second half of the context
+        # switch
+        self.switch_out = False
+
+        # The time the context switch is done
+        self.switch_at = None
+
+        # The process that's going to IO. After a process ends its CPU burst,
+        # it's "going" to IO, but it only actually goes to IO after the context
+        # switch is done. A preempted process is switched out the same way, but
+        # goes back to the ready queue
+        self.to_io = None
+
+        # Whether the process being switched out has been preempted
+        self.preempt_flag = False
+
+        # The last process that completed IO while another one was switching
+        # in. It may preempt that process once it's switched in
+        self.finished_io = None
+
+        # The time slice of the next burst
+        self.ts = tslice
+
+        # The time the current burst started, the cpu_time of the process at
+        # that time, and the times the burst completes and its time slice
+        # expires
+        self.started = None
+        self.base = 0
+        self.burst_end = None
+        self.slice_end = None
+
+        # Total time the CPU has been bursting, for its utilization
+        self.busy = 0
+
+    def sync(self, clock):
+        """
+        Method to bring the remaining and cpu_time of the bursting process up
+        to date
+        @param clock: the current time
+        """
+        self.bursting.remaining = self.burst_end - clock
+        self.bursting.cpu_time = self.base + clock - self.started
+
+    def stop(self, clock):
+        """
+        Method to account for the current burst when it completes or is
+        preempted
+        @param clock: the current time
+        """
+        self.sync(clock)
+        self.busy += clock - self.started
+
+    def idle(self):
+        """
+        Method to check whether the CPU can start switching in a process
+        @return idle: whether the CPU is neither bursting nor switching
+        """
+        return self.bursting is None and not self.switch_in and not self.switch_out
+
+class Fork():
+    """
+    A Fork class that takes the state of the loop of a simulation where the
+    variants of its policy may first act differently, so that they can be
+    simulated from there instead of from the start
+    """
+
+    def __init__(self, variants, times=None):
+        """
+        @param variants: list of the other Policies
+        @param times: the times of the workload, which every copy of the state
+        shares instead of copying them, or None
+        """
+        self.variants = variants
+        self.times = times
+
+        # The pickled state, None until the simulation took it, or if it
+        # ended before the variants could act differently
+        self.snapshot = None
+
+    def take(self, state):
+        """
+        A method to keep the state of the loop at the fork
+        @param state: dict of the state of the loop
+        """
+        f = io.BytesIO()
+        SnapshotPickler(f, self.times).dump(state)
+        self.snapshot = f.getvalue()
+
+    def state(self):
+        """
+        A method to get a copy of the state at the fork for one variant
+        @return state: dict of the state of the loop
+        """
+        return SnapshotUnpickler(io.BytesIO(self.snapshot), self.times).load()
+
+def schedule(processes, policy, tcs, sink, log=True, log_until=math.inf, cpus=1, per_cpu=False, summaries=False, profiler=None, checkpoint=None,
+             resume=None, fork=None):
+    """
+    A method to simulate the scheduling of processes by a policy
+    @param processes: list of processes to be scheduled, or an iterable that
+    streams them in the order they arrive, i.e. by arrival time and then id.
+    Streamed processes are only read as they arrive
+    @param policy: the Policy
+    @param tcs: time required to perform **HALF** context switches, i.e. time
+    needed to for either switching in or switching out
+    @param sink: the Sink that the events are emitted to
+    @param log: whether any event is logged
+    @param log_until: the time before which the detailed events are logged
+    @param cpus: number of CPUs
+    @param per_cpu: whether every CPU has its own ready queue instead of all
+    of them sharing one. A process returns to the queue of the CPU it last
+    ran on, arrivals join the least loaded CPU, and an idle CPU with an empty
+    queue steals from the longest queue
+    @param summaries: whether to summarize every process in the metrics
+    @param profiler: the Profiler that counts and times the phases of the
+    loop, None to not profile. It's also returned in the metrics
+    @param checkpoint: the Checkpoint that the state of the loop is offered to
+    every CHECKPOINT_STEPS event times, or None. If it holds a state, the
+    simulation resumes from it: the processes are then the same ones again,
+    and those read before the state was taken are skipped
+    @param resume: the state of the loop to resume from, e.g. the one a
+    variant of the policy was forked at, or None. The processes are the same
+    ones again, as for a checkpoint
+    @param fork: the Fork that the state of the loop is handed to at the first
+    event time where the variants of the policy may act differently from it,
+    or None
+    @return metrics: dict of the metrics of the simulation, including the
+    percentiles and maximum of the wait and turnaround times of the bursts
+    and of the response times of the processes, and their Histograms, the
+    number of event times the clock jumped to and the simulated time
+    """
+    if cpus < 1:
+        raise ValueError('cpus must be at least 1, not {}'.format(cpus))
+    algorithm = policy.name
+    fields = policy.fields
+    preemptive = policy.preemptive
+
+    # Without a profiler, every phase only checks this flag
+    profiling = profiler is not None
+    if profiling:
+        sink = profiler.sink(sink)
+
+    # The state of the loop to resume from, which is only used once
+    resumed = resume
+    if checkpoint is not None and checkpoint.state is not None:
+        resumed, checkpoint.state = checkpoint.state, None
+
+    # print all processes. Streamed processes are printed when they are read
+    streamed = not isinstance(processes, list)
+    if not streamed:
+        for p in processes:
+            policy.on_new(p)
+        if log and resumed is None:
+            for p in processes:
+                sink.emit(None, 'new', None, algorithm=algorithm, name=p.name, arrival=p.arrival, bursts=p.num_bursts, **fields(p))
+        processes = sorted(processes, key=lambda p: (p.arrival, p.pid))
+    arriving = iter(processes)
+
+########################## Variable Initialization #############################
+
+    # clock for counting time
+    clock = 0
+
+    # The ready queues, ordered as the policy wants. Either there is one
+    # queue shared by all CPUs, or one queue per CPU
+    if per_cpu:
+        queues = [Queue(policy.queue_mode) for _ in range(cpus)]
+    else:
+        queues = [Queue(policy.queue_mode)]
+
+    # The time slice
+    tslice = policy.tslice
+    slicing = tslice is not None
+
+    # The CPUs. Only with more than one CPU are their events tagged with the
+    # id of the CPU
+    multi = cpus > 1
+    cpu_list = [CPU(i, queues[i if per_cpu else 0], {'cpu': i} if multi else {}, tslice) for i in range(cpus)]
+
+    # A min-heap of the ids of the idle CPUs
+    idle = list(range(cpus))
+
+    # The next process to arrive, kept as a min-heap of (arrival time, id,
+    # process) like the IO heap. A process is read once the one before it
+    # has arrived
+    pre_arrival = []
+
+    # Processes currently doing IO, kept as a min-heap of (IO completion time,
+    # id, process) so ties complete IO in the order of the process ids
+    ios = []
+
+    # Number of bursts started, i.e. of context switches
+    context_switches = 0
+
+    # Future-event list: a heap of the (time, CPU id) at which a CPU can change
+    # state, i.e. burst completions, time slice expiries and context switch
+    # completions. Together with the arrival and IO heaps, the clock jumps
+    # from event to event, and only the CPUs with an event are looked at
+    events = []
+
+    # Number of preemptions
+    preemption = 0
+
+    # Number of times the clock jumped to an event, i.e. of loop iterations
+    steps = 0
+
+    # Total number of bursts of the processes read so far
+    burst_number = 0
+
+    # Total wait time and number of waits, i.e. of times a process was put on
+    # a ready queue
+    wait_total = 0
+    wait_number = 0
+
+    # Wait and turnaround time of every burst, recorded when the burst
+    # completes, for their percentiles
+    waits = Histogram()
+    turnarounds = Histogram()
+
+    # Time until the first burst of every process started, recorded when the
+    # process is first dispatched
+    responses = Histogram()
+
+    # (id, summary) of every terminated process, if asked for
+    summary = []
+
+    def read_next():
+        """
+        A method to read the next process to arrive into pre_arrival
+        """
+        nonlocal burst_number, last_arrival, read
+        p = next(arriving, None)
+        if p is None:
+            return
+        read += 1
+        if (p.arrival, p.pid) < last_arrival:
+            raise ValueError('processes must be streamed in the order of their arrival times, process {} is not'.format(p.name))
+        if streamed:
+            policy.on_new(p)
+            if log:
+                sink.emit(None, 'new', None, algorithm=algorithm, name=p.name, arrival=p.arrival, bursts=p.num_bursts, **fields(p))
+        last_arrival = (p.arrival, p.pid)
+        burst_number += p.num_bursts
+        heapq.heappush(pre_arrival, (p.arrival, p.pid, p))
+
+    # The arrival time and id of the last process read, and the number of
+    # processes read
+    last_arrival = (-1, -1)
+    read = 0
+
+    def ready_cpu(p):
+        """
+        A method to get the CPU whose ready queue a process joins. With one
+        queue that's the first CPU, which shares it with all others
+        @param p: the Process
+        @return cpu: the CPU
+        """
+        if not per_cpu:
+            return cpu_list[0]
+        if p.cpu is not None:
+            return cpu_list[p.cpu]
+        # A new process joins the least loaded CPU, counting the process it
+        # runs
+        return min(cpu_list, key=lambda cpu: (len(cpu.queue) + (not cpu.idle()), cpu.id))
+
+    def dispatch(clock):
+        """
+        A method to start switching in a process on every idle CPU, in the
+        order of their ids, as long as there is a process ready
+        @param clock: the current time
+        """
+        while idle:
+            cpu = cpu_list[idle[0]]
+            queue = cpu.queue
+            if len(queue) == 0:
+                if not per_cpu:
+                    break
+                # Steal from the longest queue, if any process is ready at all
+                queue = max(queues, key=len)
+                if len(queue) == 0:
+                    break
+            heapq.heappop(idle)
+            p = policy.select_next(queue)
+
+            # The process has waited since it was put on the ready queue
+            nonlocal wait_total
+            if profiling:
+                start = perf_counter()
+            p.wait += clock - p.ready
+            wait_total += clock - p.ready
+            if p.response is None:
+                p.response = clock + tcs - p.arrival
+                responses.record(p.response)
+            if profiling:
+                profiler.counts['wait'] += 1
+                profiler.lap('wait', start)
+            cpu.bursting = p
+            cpu.switch_in = True
+            cpu.switch_at = clock + tcs
+            heapq.heappush(events, (cpu.switch_at, cpu.id))
+            p.cpu = cpu.id
+
+            # The process is no longer ready, so it can't preempt any CPU
+            if multi and preemptive:
+                for other in cpu_list:
+                    if other.finished_io is p:
+                        other.finished_io = None
+
+    def switch_out(cpu, clock, preempted):
+        """
+        A method to start switching out the process bursting on a CPU
+        @param cpu: the CPU
+        @param clock: the current time
+        @param preempted: whether the process has been preempted, i.e. goes
+        back to the ready queue instead of IO
+        """
+        cpu.switch_out = True
+        cpu.switch_at = clock + tcs
+        heapq.heappush(events, (cpu.switch_at, cpu.id))
+        if preempted:
+            cpu.bursting.preemptions += 1
+            cpu.to_io = cpu.bursting
+            cpu.preempt_flag = True
+        cpu.bursting = None
+
+    def loop_state():
+        """
+        A method to get the state of the loop between two event times. The
+        processes that weren't read yet aren't part of it
+        @return state: dict of the state
+        """
+        return {'clock': clock, 'queues': queues, 'cpu_list': cpu_list, 'idle': idle, 'pre_arrival': pre_arrival,
+                'ios': ios, 'events': events, 'context_switches': context_switches, 'preemption': preemption,
+                'steps': steps, 'burst_number': burst_number, 'wait_total': wait_total, 'wait_number': wait_number,
+                'waits': waits, 'turnarounds': turnarounds, 'responses': responses, 'summary': summary,
+                'last_arrival': last_arrival, 'read': read}
+
+################################## Overhead ####################################
+
+    if resumed is not None:
+        # Pick up the loop where the state was taken. The processes read
+        # before are in the state, in the state they were in
+        clock = resumed['clock']
+        queues = resumed['queues']
+        cpu_list = resumed['cpu_list']
+        idle = resumed['idle']
+        pre_arrival = resumed['pre_arrival']
+        ios = resumed['ios']
+        events = resumed['events']
+        context_switches = resumed['context_switches']
+        preemption = resumed['preemption']
+        steps = resumed['steps']
+        burst_number = resumed['burst_number']
+        wait_total = resumed['wait_total']
+        wait_number = resumed['wait_number']
+        waits = resumed['waits']
+        turnarounds = resumed['turnarounds']
+        responses = resumed['responses']
+        summary = resumed['summary']
+        last_arrival = resumed['last_arrival']
+        read = resumed['read']
+        arriving = itertools.islice(arriving, read, None)
+
+        # The time slice is the one of the policy, which may be a variant of
+        # the one the state was taken with
+        for cpu in cpu_list:
+            cpu.ts = tslice
+    else:
+        if log:
+            sink.emit(0, 'start', queues[0], algorithm=algorithm, **policy.start_fields())
+
+        # Put all processes that arrive at time 0 to the queue
+        read_next()
+        while pre_arrival and pre_arrival[0][0] == 0:
+            p = heapq.heappop(pre_arrival)[2]
+            read_next()
+            cpu = ready_cpu(p)
+            policy.on_ready(cpu.queue, p)
+            p.wait = 0
+            p.queued = p.ready = clock
+            wait_number += 1
+            if log:
+                sink.emit(clock, 'arrival', cpu.queue, **(cpu.tag if per_cpu else {}), name=p.name, **fields(p))
+
+        # Select a process to burst on every CPU if the queue is not empty
+        dispatch(clock)
+
+################################# Simulation ###################################
+
+    if profiling:
+        loop_start = mark = perf_counter()
+    while (True):
+        """
+        The workflow:
+        1. taking out a process from bursting
+        2. add a new process to burst
+        3. check for any completed IO
+        4. check for any process arrival
+        For ties in any of the above events, break with the process ids, i.e.
+        Process A is should finish IO ahead of Process B. Each step is done
+        for every CPU with an event, in the order of their ids
+        """
+
+        # Hand the state over to the fork before the first event time where
+        # the variants of the policy may act differently. The variants go on
+        # from a copy of it
+        if fork is not None:
+            until = next_event(events, clock, ios, pre_arrival)
+            if any(policy.diverges(cpu, until, fork.variants) for cpu in cpu_list):
+                fork.take(loop_state())
+                fork = None
+
+        # Jump the clock to the next event. Nothing happens in the ticks in
+        # between
+        clock = next_event(events, clock, ios, pre_arrival)
+        steps += 1
+
+        # The CPUs with an event at this time
+        due = set()
+        while events and events[0][0] == clock:
+            due.add(heapq.heappop(events)[1])
+        due = [cpu_list[i] for i in sorted(due)]
+        if profiling:
+            profiler.counts['next_event'] += 1
+            mark = profiler.lap('next_event', mark)
+
+        # Do a CPU burst
+        for cpu in due:
+            bursting = cpu.bursting
+            if bursting == None or cpu.switch_in:
+                continue
+            if profiling:
+                profiler.counts['burst'] += 1
+
+            # If a process finished bursting, check if the process is
+            # terminating. If not, put it to IO. Also turns on context switches.
+            if clock == cpu.burst_end:
+                cpu.stop(clock)
+                bursting.num_bursts -= 1
+
+                # The turnaround of the burst ends once it's switched out
+                waits.record(bursting.wait)
+                bursting.total_wait += bursting.wait
+                turnarounds.record(clock + tcs - bursting.queued)
+                bursting.advance()
+                if bursting.num_bursts == 0:
+                    if summaries:
+                        summary.append((bursting.pid, {'name': bursting.name, 'arrival': bursting.arrival, 'bursts': bursting.bursts,
+                                                       'wait': bursting.total_wait, 'turnaround': clock + tcs - bursting.arrival,
+                                                       'response': bursting.response, 'preemptions': bursting.preemptions}))
+                    if log:
+                        sink.emit(clock, 'terminated', cpu.queue, **cpu.tag, name=bursting.name)
+                else:
+                    if clock < log_until:
+                        sink.emit(clock, 'burst_complete', cpu.queue, **cpu.tag, name=bursting.name, **fields(bursting), bursts=bursting.num_bursts)
+                    new_tau = policy.on_burst_complete(bursting)
+                    if clock < log_until:
+                        if new_tau is not None:
+                            sink.emit(clock, 'tau_update', cpu.queue, **cpu.tag, name=bursting.name, new_tau=new_tau)
+                        sink.emit(clock, 'switch_out', cpu.queue, **cpu.tag, name=bursting.name, until=clock + bursting.remaining + tcs)
+                    cpu.to_io = bursting
+                bursting.cpu_time = 0
+                switch_out(cpu, clock, False)
+
+            # If the time slice expired, preempt the process if another one is
+            # ready, otherwise start a new time slice
+            elif clock == cpu.slice_end:
+                if len(cpu.queue):
+                    cpu.stop(clock)
+                    if clock < log_until:
+                        sink.emit(clock, 'slice_expire', cpu.queue, **cpu.tag, name=bursting.name, burst=bursting.remaining)
+                    switch_out(cpu, clock, True)
+                    preemption += 1
+                else:
+                    cpu.ts = tslice
+                    cpu.slice_end = clock + cpu.ts
+                    if cpu.slice_end < cpu.burst_end:
+                        heapq.heappush(events, (clock + int(cpu.ts), cpu.id))
+        if profiling:
+            mark = profiler.lap('burst', mark)
+
+        # Doing context switch and if context switch done, put a process into
+        # bursting
+        for cpu in due:
+            if not cpu.switch_in or clock != cpu.switch_at:
+                continue
+            bursting = cpu.bursting
+            cpu.switch_in = False
+            context_switches += 1
+            if profiling:
+                profiler.counts['switch_in'] += 1
+            cpu.started = clock
+            cpu.base = bursting.cpu_time
+            cpu.burst_end = clock + bursting.remaining
+            heapq.heappush(events, (cpu.burst_end, cpu.id))
+            # A time slice that can't expire before the burst completes has no
+            # event of its own
+            if slicing:
+                cpu.slice_end = clock + cpu.ts
+                if cpu.slice_end < cpu.burst_end:
+                    heapq.heappush(events, (clock + int(cpu.ts), cpu.id))
+            if clock < log_until:
+                sink.emit(clock, policy.start_kind(bursting), cpu.queue, **cpu.tag, name=bursting.name, **fields(bursting), burst=bursting.remaining)
+
+            # A process that completed IO during the context switch may
+            # preempt the process right away
+            finished_io = cpu.finished_io
+            if finished_io != None:
+                if policy.should_preempt(bursting, finished_io):
+                    if clock < log_until:
+                        sink.emit(clock, 'preempt', cpu.queue, **cpu.tag, name=finished_io.name, **fields(finished_io), preempted=bursting.name)
+                    preemption += 1
+                    cpu.stop(clock)
+                    switch_out(cpu, clock, True)
+                    if multi:
+                        for other in cpu_list:
+                            if other.finished_io is finished_io:
+                                other.finished_io = None
+                cpu.finished_io = None
+        if profiling:
+            mark = profiler.lap('switch_in', mark)
+
+        # Put the preempted process back to the ready queue right when its
+        # context switch is done
+        freed = []
+        for cpu in due:
+            if cpu.switch_out and cpu.preempt_flag and clock == cpu.switch_at:
+                cpu.switch_out = False
+                cpu.preempt_flag = False
+                if profiling:
+                    profiler.counts['requeue'] += 1
+                policy.on_ready(cpu.queue, cpu.to_io)
+                cpu.to_io.ready = clock
+                cpu.to_io = None
+                cpu.ts = tslice
+                freed.append(cpu)
+        if profiling:
+            mark = profiler.lap('requeue', mark)
+
+        # Check if any process completed IO at this time. Ties pop off the heap
+        # in the order of the process ids
+        while ios and ios[0][0] == clock:
+            p = heapq.heappop(ios)[2]
+            if profiling:
+                profiler.counts['io'] += 1
+            p.advance()
+            home = ready_cpu(p)
+            policy.on_ready(home.queue, p)
+            p.wait = 0
+            p.queued = p.ready = clock
+            wait_number += 1
+
+            # The process may preempt a CPU it can be dispatched to, unless
+            # one of them is idle and takes it anyway
+            target = None
+            if preemptive:
+                candidates = [home] if per_cpu else cpu_list
+                if len(idle) == 0 or per_cpu:
+                    for cpu in candidates:
+                        if cpu.bursting != None and (not cpu.switch_in):
+                            cpu.sync(clock)
+                            if policy.should_preempt(cpu.bursting, p):
+                                target = cpu
+                                break
+            if target != None:
+                if clock < log_until:
+                    sink.emit(clock, 'io_preempt', target.queue, **target.tag, name=p.name, **fields(p), preempted=target.bursting.name)
+                preemption += 1
+                target.stop(clock)
+                switch_out(target, clock, True)
+            else:
+                if preemptive:
+                    for cpu in candidates:
+                        if cpu.switch_in:
+                            cpu.finished_io = p
+                if clock < log_until:
+                    sink.emit(clock, 'io_complete', home.queue, **(home.tag if per_cpu else {}), name=p.name, **fields(p))
+        if profiling:
+            mark = profiler.lap('io', mark)
+
+        # Check if any process arrives at this time
+        while pre_arrival and pre_arrival[0][0] == clock:
+            p = heapq.heappop(pre_arrival)[2]
+            if profiling:
+                profiler.counts['arrival'] += 1
+            read_next()
+            cpu = ready_cpu(p)
+            policy.on_ready(cpu.queue, p)
+            p.wait = 0
+            p.queued = p.ready = clock
+            wait_number += 1
+            if clock < log_until:
+                sink.emit(clock, 'arrival', cpu.queue, **(cpu.tag if per_cpu else {}), name=p.name, **fields(p))
+        if profiling:
+            mark = profiler.lap('arrival', mark)
+
+        # Doing switch out. If done, put a process into IO.
+        for cpu in due:
+            if cpu.switch_out and clock == cpu.switch_at:
+                cpu.switch_out = False
+                if profiling:
+                    profiler.counts['switch_out'] += 1
+                if cpu.to_io != None:
+                    heapq.heappush(ios, (clock + cpu.to_io.remaining, cpu.to_io.pid, cpu.to_io))
+                cpu.to_io = None
+                cpu.ts = tslice
+                freed.append(cpu)
+
+        # The CPUs that are done switching out are idle now
+        for cpu in freed:
+            if cpu.idle():
+                heapq.heappush(idle, cpu.id)
+        if profiling:
+            mark = profiler.lap('switch_out', mark)
+
+        # If a CPU is idle and a queue is not empty, pop the queue and start
+        # switching in
+        dispatch(clock)
+        if profiling:
+            mark = profiler.lap('dispatch', mark)
+
+        # If there isn't a process anywhere, break the simulation, and directly
+        # add tcs to the clock to account for the final context switch
+        done = len(pre_arrival) == 0 and len(ios) == 0 and all(len(queue) == 0 for queue in queues) and \
+               all(cpu.bursting == None and cpu.to_io == None for cpu in cpu_list)
+        if profiling:
+            profiler.counts['end_check'] += 1
+            mark = profiler.lap('end_check', mark)
+        if done:
+            if log:
+                sink.emit(clock + tcs, 'end', queues[0], algorithm=algorithm)
+            break
+
+        # Offer the state of the loop to the checkpoint now and then
+        if checkpoint is not None and steps % CHECKPOINT_STEPS == 0:
+            checkpoint.save(loop_state())
+
+############################# metrics calculation ##############################
+
+    # Calculate average burst time
+    busy = sum(cpu.busy for cpu in cpu_list)
+    avg_burst = busy / burst_number
+
+    # Calculate average wait time over all the times a process waited
+    avg_wait = wait_total / wait_number
+
+    # Create the metrics data.
+    # Note that every context switch adds tcs * 2 to the turnaround of a
+    # burst, and there may be more context switches than bursts. Without
+    # preemptions there are as many, and this is avg_burst + avg_wait + tcs * 2
+    metrics = {
+        'avg_burst': avg_burst,
+        'avg_wait': avg_wait,
+        'avg_turnaround': avg_burst + avg_wait + context_switches*tcs * 2/(burst_number),
+        'context_switches': context_switches,
+        'preemptions': preemption,
+        'utilization': busy / (cpus * (clock + tcs)) * 100,
+        'cpu_utilizations': [cpu.busy / (clock + tcs) * 100 for cpu in cpu_list],
+        'avg_response': responses.mean(),
+        'events': steps,
+        'time': clock + tcs,
+        'waits': waits,
+        'turnarounds': turnarounds,
+        'responses': responses,
+    }
+    for name, histogram in (('wait', waits), ('turnaround', turnarounds), ('response', responses)):
+        for q in PERCENTILES:
+            metrics['{}_p{}'.format(name, q)] = histogram.percentile(q)
+        metrics[name + '_max'] = histogram.max
+
+    # The profile of the loop. Every process dispatched is one wait accounted
+    if profiling:
+        profiler.total = perf_counter() - loop_start
+        profiler.events = steps
+        profiler.ticks = clock + tcs
+        profiler.counts['dispatch'] = profiler.counts['wait']
+        metrics['profile'] = profiler
+
+    # The summaries in the order of the process ids
+    if summaries:
+        summary.sort(key=lambda item: item[0])
+        metrics['processes'] = [process for pid, process in summary]
+    return metrics
+
+def schedule_variants(processes, policies, tcs, cpus=1, per_cpu=False, summaries=False, times=None):
+    """
+    A method to simulate the scheduling of the same processes by variants of a
+    policy, i.e. policies of the same class that only differ in their
+    parameters, e.g. RR with different time slices. The first policy is
+    simulated from the start and the others are forked from it at the first
+    event time where they may act differently, so the time before it is only
+    simulated once. Nothing is logged
+    @param processes: function that returns fresh processes to be scheduled,
+    as for schedule()
+    @param policies: list of the Policies
+    @param tcs: time required to perform **HALF** context switches
+    @param cpus: number of CPUs
+    @param per_cpu: whether every CPU has its own ready queue
+    @param summaries: whether to summarize every process in the metrics
+    @param times: the times of the workload, or None
+    @return metrics: list of the metrics of every policy, in order
+    """
+    sink = NullSink()
+    fork = Fork(policies[1:], times) if len(policies) > 1 else None
+    all_metrics = [schedule(processes(), policies[0], tcs, sink, False, 0, cpus, per_cpu, summaries, fork=fork)]
+    for policy in policies[1:]:
+        # If the simulation ended before the variants could act differently,
+        # they all have the same metrics
+        if fork.snapshot is None:
+            all_metrics.append(dict(all_metrics[0]))
+        else:
+            all_metrics.append(schedule(processes(), policy, tcs, sink, False, 0, cpus, per_cpu, summaries, resume=fork.state()))
+    return all_metrics
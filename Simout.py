@@ -0,0 +1,166 @@
+from Scheduler import PERCENTILES
+import csv
+import json
+
+# The times whose distribution is in the metrics, and the statistics of each
+# of them, e.g. 'wait_p99' or 'response_max'
+DISTRIBUTIONS = ['wait', 'turnaround', 'response']
+STATISTICS = ['p{}'.format(q) for q in PERCENTILES] + ['max']
+
+# The metrics of an algorithm in a machine readable simout, in order
+METRICS = ['avg_burst', 'avg_wait', 'avg_turnaround', 'context_switches', 'preemptions', 'utilization', 'avg_response'] + \
+          ['{}_{}'.format(name, statistic) for name in DISTRIBUTIONS for statistic in STATISTICS]
+
+# The summary of a process, in order
+PROCESS_FIELDS = ['name', 'arrival', 'bursts', 'wait', 'turnaround', 'response', 'preemptions']
+
+def format_metrics(algorithm, metrics):
+    """
+    A method to format the metrics of an algorithm the way they are written to
+    simout
+    @param algorithm: name of the algorithm
+    @param metrics: dict of the metrics returned by the algorithm
+    @return data: the metrics data
+    """
+    # With more than one CPU, the utilization of each CPU follows the
+    # aggregate one
+    per_cpu = ''
+    utilizations = metrics.get('cpu_utilizations', [])
+    if len(utilizations) > 1:
+        for i, utilization in enumerate(utilizations):
+            per_cpu += '-- CPU {} utilization: {:.3f}%\n'.format(i, utilization)
+
+    # The tails of the times, if the algorithm measured them
+    tails = ''
+    if 'avg_response' in metrics:
+        tails += '-- average response time: {:.3f} ms\n'.format(metrics['avg_response'])
+        for name in DISTRIBUTIONS:
+            tails += '-- {} time p50/p90/p99/max: {:.3f}/{:.3f}/{:.3f}/{:.3f} ms\n'.format(
+                name, metrics[name + '_p50'], metrics[name + '_p90'], metrics[name + '_p99'], metrics[name + '_max'])
+
+    # One line per process, if the processes were summarized
+    processes = ''
+    for process in metrics.get('processes', []):
+        processes += '-- process {name}: arrival {arrival} ms, {bursts} CPU bursts, wait {wait} ms, ' \
+                     'turnaround {turnaround} ms, response {response} ms, {preemptions} preemptions\n'.format(**process)
+    return 'Algorithm {}\n'.format(algorithm) + \
+           '-- average CPU burst time: {:.3f} ms\n'.format(metrics['avg_burst']) + \
+           '-- average wait time: {:.3f} ms\n'.format(metrics['avg_wait']) + \
+           '-- average turnaround time: {:.3f} ms\n'.format(metrics['avg_turnaround']) + \
+           '-- total number of context switches: {}\n'.format(metrics['context_switches']) + \
+           '-- total number of preemptions: {}\n'.format(metrics['preemptions']) + \
+           '-- CPU utilization: {:.3f}%\n'.format(metrics['utilization']) + \
+           per_cpu + tails + processes
+
+def metrics_record(algorithm, metrics):
+    """
+    A method to get the metrics of an algorithm as the JSON object they are
+    written as, with the utilization of every CPU and the process summaries
+    @param algorithm: name of the algorithm
+    @param metrics: dict of the metrics returned by the algorithm
+    @return record: dict of the metrics that can be dumped as JSON
+    """
+    record = {'algorithm': algorithm}
+    record.update((key, metrics[key]) for key in METRICS)
+    record['cpu_utilizations'] = metrics['cpu_utilizations']
+    if 'processes' in metrics:
+        record['processes'] = metrics['processes']
+    return record
+
+class Simout():
+    """
+    A Simout class that the metrics of every algorithm are written to.
+    Subclasses decide the format and the file
+    """
+
+    # The file written when no stream is given
+    filename = None
+
+    def __init__(self, stream=None):
+        """
+        @param stream: the file object to write to, the file of the format by
+        default. Only a file opened by the simout is closed by it
+        """
+        self.owned = stream is None
+        self.stream = stream if stream is not None else open(self.filename, 'w', newline='')
+
+    def write(self, algorithm, metrics):
+        """
+        A method to write the metrics of an algorithm
+        @param algorithm: name of the algorithm
+        @param metrics: dict of the metrics returned by the algorithm
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        A method to be called once all algorithms are written
+        """
+        if self.owned:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+class TextSimout(Simout):
+    """
+    A simout with the human readable metrics of format_metrics
+    """
+
+    filename = 'simout.txt'
+
+    def write(self, algorithm, metrics):
+        self.stream.write(format_metrics(algorithm, metrics))
+
+class JsonSimout(Simout):
+    """
+    A simout with one JSON object per algorithm and line (JSON Lines), with
+    the metrics, the utilization of every CPU and the process summaries
+    """
+
+    filename = 'simout.jsonl'
+
+    def write(self, algorithm, metrics):
+        self.stream.write(json.dumps(metrics_record(algorithm, metrics)) + '\n')
+
+class CsvSimout(Simout):
+    """
+    A simout with one CSV row per algorithm. The process summaries go to a
+    second CSV file with one row per algorithm and process, which is only
+    created if there are any
+    """
+
+    filename = 'simout.csv'
+    processes_filename = 'simout-processes.csv'
+
+    def __init__(self, stream=None, processes_stream=None):
+        """
+        @param stream: the file object to write to, simout.csv by default
+        @param processes_stream: the file object to write the process
+        summaries to, simout-processes.csv by default
+        """
+        super().__init__(stream)
+        self.writer = csv.DictWriter(self.stream, fieldnames=['algorithm'] + METRICS, extrasaction='ignore')
+        self.writer.writeheader()
+        self.processes_stream = processes_stream
+        self.processes_owned = processes_stream is None
+        self.processes_writer = None
+
+    def write(self, algorithm, metrics):
+        self.writer.writerow(dict(metrics, algorithm=algorithm))
+        if 'processes' not in metrics:
+            return
+        if self.processes_writer is None:
+            if self.processes_stream is None:
+                self.processes_stream = open(self.processes_filename, 'w', newline='')
+            self.processes_writer = csv.DictWriter(self.processes_stream, fieldnames=['algorithm'] + PROCESS_FIELDS)
+            self.processes_writer.writeheader()
+        for process in metrics['processes']:
+            self.processes_writer.writerow(dict(process, algorithm=algorithm))
+
+    def close(self):
+        super().close()
+        if self.processes_stream is not None and self.processes_owned:
+            self.processes_stream.close()
+
+# The simout formats by name
+SIMOUTS = {'text': TextSimout, 'json': JsonSimout, 'csv': CsvSimout}
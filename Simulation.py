@@ -0,0 +1,118 @@
+from project import ALGORITHMS, Naming, Precedence, ReadyQueues, create_policy, create_workload
+from Rand48 import Rand48
+from Scheduler import schedule
+from Simout import format_metrics, metrics_record
+from Sink import NullSink, RecordingSink, event_record
+from Workload import Workload
+import argparse
+import math
+
+# The parameters of a simulation and their defaults, as for project.py.
+# Without Lambda, the initial tau of SJF and SRT is the one of the Workload
+DEFAULTS = {'Lambda': None, 'tcs': 4, 'alpha': 0.5, 'tslice': 128, 'rradd': 'END', 'cpus': 1, 'queues': 'global',
+            'per_process': False}
+
+class Result():
+    """
+    A Result class holding what one simulation measured: the metrics that
+    simout has, the utilization of every CPU, the Histograms of the wait,
+    turnaround and response times, the process summaries if they were asked
+    for, and the events if they were asked for. The metrics are attributes
+    too, e.g. result.avg_wait or result.wait_p99
+    """
+
+    def __init__(self, algorithm, metrics, events=None):
+        """
+        @param algorithm: name of the algorithm
+        @param metrics: dict of the metrics returned by the algorithm. Note
+        that metrics['events'] is the number of event times, not the events
+        @param events: list of the events as dicts like those of JsonSink, or
+        None if they weren't recorded
+        """
+        self.algorithm = algorithm
+        self.metrics = metrics
+        self.events = events
+
+    def __getattr__(self, name):
+        # Only called for the names that aren't attributes
+        metrics = self.__dict__.get('metrics', {})
+        if name not in metrics:
+            raise AttributeError("'Result' object has no attribute '{}'".format(name))
+        return metrics[name]
+
+    def record(self):
+        """
+        A method to get the metrics as the JSON object they are written as to
+        a JSON simout
+        @return record: dict of the metrics that can be dumped as JSON
+        """
+        return metrics_record(self.algorithm, self.metrics)
+
+    def __str__(self):
+        return format_metrics(self.algorithm, self.metrics)
+
+    def __repr__(self):
+        return 'Result({}, avg_wait={:.3f}, avg_turnaround={:.3f}, utilization={:.3f})'.format(
+            self.algorithm, self.metrics['avg_wait'], self.metrics['avg_turnaround'], self.metrics['utilization'])
+
+def generate(n, seed, Lambda, max, names=Naming.LETTERS):
+    """
+    A method to generate a workload with the 48-bit random number generator,
+    as project.py does
+    @param n: number of processes
+    @param seed: the seed for the random number generator
+    @param Lambda: the inverse of the average of the exponential distribution
+    @param max: upper bound for random numbers
+    @param names: the Naming of the processes, or its value, e.g. 'numeric'
+    @return workload: the Workload
+    """
+    return create_workload(Rand48(seed, Lambda, max), n, 1/Lambda, Naming(names))
+
+def simulate(workload, algorithm, params=None, events=False):
+    """
+    A method to simulate one algorithm without writing anything, e.g.
+
+        workload = generate(8, 2, 0.01, 256)
+        result = simulate(workload, 'RR', {'tslice': 64, 'cpus': 2})
+        result.avg_wait, result.wait_p99, result.cpu_utilizations
+
+    A Workload can be simulated any number of times, by any algorithm
+    @param workload: the Workload, or the processes to be scheduled, i.e. a
+    list of them or an iterable that streams them in the order they arrive.
+    Processes are modified by the simulation, so they're only simulated once
+    @param algorithm: name of the algorithm, one of ALGORITHMS
+    @param params: dict of the parameters that differ from DEFAULTS, or the
+    NameSpace of the arguments of project.py
+    @param events: whether to record every event in the Result
+    @return result: the Result
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError('unknown algorithm {}, the algorithms are {}'.format(algorithm, ', '.join(ALGORITHMS)))
+    if isinstance(params, argparse.Namespace):
+        params = {name: value for name, value in vars(params).items() if name in DEFAULTS}
+    values = dict(DEFAULTS)
+    for name, value in (params or {}).items():
+        if name not in DEFAULTS:
+            raise ValueError('unknown parameter {}, the parameters are {}'.format(name, ', '.join(DEFAULTS)))
+        values[name] = value
+    values['rradd'] = Precedence(values['rradd'])
+    values['queues'] = ReadyQueues(values['queues'])
+
+    # The initial tau of SJF and SRT is the one of the workload, unless Lambda
+    # is given
+    if values['Lambda'] is not None and values['Lambda'] <= 0:
+        raise ValueError('Lambda must be positive, not {}'.format(values['Lambda']))
+    if isinstance(workload, Workload):
+        processes = workload.processes()
+    else:
+        processes = workload
+        if values['Lambda'] is None and algorithm in ('SJF', 'SRT'):
+            raise ValueError('Lambda is needed for the initial tau of {} of processes that are not a Workload'.format(algorithm))
+    tau = workload.tau if values['Lambda'] is None else None
+    policy = create_policy(algorithm, argparse.Namespace(**values), tau)
+
+    # We divide tcs by 2 to indicate half of the context switch time
+    sink = RecordingSink() if events else NullSink()
+    metrics = schedule(processes, policy, values['tcs'] // 2, sink, events, math.inf if events else 0, values['cpus'],
+                       values['queues'] == ReadyQueues.PER_CPU, values['per_process'])
+    return Result(algorithm, metrics, [event_record(*event) for event in sink.events] if events else None)
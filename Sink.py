@@ -0,0 +1,241 @@
+import json
+import sys
+
+# Text of every event in the event log. A process with a tau gets
+# ' (tau XXms)' after its name, and {s} is the plural of the burst count
+TEMPLATES = {
+    'new': 'Process {name} [NEW] (arrival time {arrival} ms) {bursts} CPU burst{s}{tau}',
+    'start': 'Simulator started for {algorithm}{detail}',
+    'end': 'Simulator ended for {algorithm}',
+    'arrival': 'Process {name}{tau} arrived; placed on ready queue',
+    'io_complete': 'Process {name}{tau} completed I/O; placed on ready queue',
+    'io_preempt': 'Process {name}{tau} completed I/O; preempting {preempted}',
+    'burst_start': 'Process {name}{tau} started using the CPU for {burst}ms burst',
+    'burst_resume': 'Process {name}{tau} started using the CPU with {burst}ms burst remaining',
+    'burst_complete': 'Process {name}{tau} completed a CPU burst; {bursts} burst{s} to go',
+    'tau_update': 'Recalculated tau ({new_tau}ms) for process {name}',
+    'switch_out': 'Process {name} switching out of CPU; will block on I/O until time {until}ms',
+    'preempt': 'Process {name}{tau} will preempt {preempted}',
+    'slice_expire': 'Time slice expired; process {name} preempted with {burst}ms to go',
+    'terminated': 'Process {name} terminated',
+}
+
+class Sink():
+    """
+    A Sink class that the schedulers emit their events to. It buffers the
+    output and writes it to the stream in large chunks. Subclasses decide how
+    an event is formatted
+    """
+
+    # The attributes that carry formatting state from one event to the next,
+    # which a checkpoint keeps so that a resumed run formats like the original
+    state = ()
+
+    def __init__(self, stream=None, buffer_size=1 << 16):
+        """
+        @param stream: the file object to write to, stdout by default
+        @param buffer_size: number of characters to collect before writing
+        """
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.buffered = 0
+
+        # Number of characters written out to the stream so far
+        self.written = 0
+
+    def emit(self, clock, kind, queue, **fields):
+        """
+        A method to record an event
+        @param clock: the time of the event, None for events before the
+        simulation starts
+        @param kind: the kind of the event, one of the keys of TEMPLATES
+        @param queue: the ready queue at the time of the event
+        @param fields: the details of the event, e.g. name of the process
+        """
+        raise NotImplementedError
+
+    def write(self, text):
+        """
+        A method to buffer text, writing the buffer out once it is full
+        @param text: the text to be written
+        """
+        self.buffer.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        A method to write out everything that's buffered
+        """
+        if self.buffer:
+            text = ''.join(self.buffer)
+            self.stream.write(text)
+            self.written += len(text)
+            self.buffer = []
+            self.buffered = 0
+        self.stream.flush()
+
+    def close(self):
+        """
+        A method to be called once all simulations are done
+        """
+        self.flush()
+
+    def snapshot(self):
+        """
+        A method to get the formatting state of the sink
+        @return state: dict of the attributes in state
+        """
+        return {name: getattr(self, name) for name in self.state}
+
+    def restore(self, state):
+        """
+        A method to continue formatting from a state taken by snapshot()
+        @param state: dict of the attributes in state
+        """
+        for name, value in state.items():
+            setattr(self, name, value)
+
+class NullSink(Sink):
+    """
+    A sink that drops every event
+    """
+
+    def emit(self, clock, kind, queue, **fields):
+        pass
+
+    def flush(self):
+        pass
+
+class TextSink(Sink):
+    """
+    A sink that writes the human readable event log, i.e.
+    'time 0ms: Simulator started for FCFS [Q <empty>]'. With more than one CPU,
+    the events of a CPU are prefixed by its id, e.g. '[CPU 1] '
+    """
+
+    state = ('ended',)
+
+    def __init__(self, stream=None, buffer_size=1 << 16):
+        super().__init__(stream, buffer_size)
+
+        # Whether a simulation has ended and is waiting for its separator. The
+        # separator is only written if another simulation follows
+        self.ended = False
+
+    def emit(self, clock, kind, queue, **fields):
+        if self.ended:
+            self.write(' \n\n')
+            self.ended = False
+        values = dict(fields)
+        values['tau'] = ' (tau {}ms)'.format(fields['tau']) if 'tau' in fields else ''
+        values['s'] = '' if fields.get('bursts') == 1 else 's'
+        values['detail'] = ''
+        if 'tslice' in fields:
+            values['detail'] = ' with time slice {}ms and rr_add to {}'.format(fields['tslice'], fields['rradd'])
+        text = TEMPLATES[kind].format(**values)
+        if 'cpu' in fields:
+            text = '[CPU {}] '.format(fields['cpu']) + text
+        if kind == 'new':
+            self.write(text + '\n')
+        elif kind == 'end':
+            self.write('time {}ms: {} {}'.format(clock, text, queue))
+            self.ended = True
+        else:
+            self.write('time {}ms: {} {}\n'.format(clock, text, queue))
+
+    def close(self):
+        if self.ended:
+            self.write('\n')
+            self.ended = False
+        self.flush()
+
+class JsonSink(Sink):
+    """
+    A sink that writes one JSON object per event (JSON Lines), with the time,
+    algorithm, kind of the event, its details and the ready queue
+    """
+
+    state = ('algorithm',)
+
+    def __init__(self, stream=None, buffer_size=1 << 16):
+        super().__init__(stream, buffer_size)
+
+        # The algorithm being simulated, taken from the last event that named
+        # it, i.e. 'new' and 'start'
+        self.algorithm = None
+
+    def emit(self, clock, kind, queue, **fields):
+        self.algorithm = fields.pop('algorithm', self.algorithm)
+        self.write(json.dumps(event_record(clock, kind, queue, fields, self.algorithm)) + '\n')
+
+def event_record(clock, kind, queue, fields, algorithm=None):
+    """
+    A method to get an event as the JSON object that JsonSink writes
+    @param clock: the time of the event
+    @param kind: the kind of the event, one of the keys of TEMPLATES
+    @param queue: the ready queue at the time of the event, or None
+    @param fields: dict of the details of the event
+    @param algorithm: the algorithm being simulated, left out if None
+    @return event: dict of the event
+    """
+    event = {'time': clock}
+    if algorithm is not None:
+        event['algorithm'] = algorithm
+    event['event'] = kind
+    event.update(fields)
+    if queue is not None:
+        event['queue'] = queue.names()
+    return event
+
+class QueueView():
+    """
+    A snapshot of the ready queue at the time of an event. It prints and
+    names like the Queue it was taken from
+    """
+
+    def __init__(self, names):
+        """
+        @param names: the names of the queued processes in printed order
+        """
+        self.queued = names
+
+    def __str__(self):
+        if len(self.queued) == 0:
+            return '[Q <empty>]'
+        return '[Q ' + ' '.join(self.queued) + ']'
+
+    def names(self):
+        return self.queued
+
+class RecordingSink(Sink):
+    """
+    A sink that keeps the events in memory, so that they can be sent back from
+    a worker process and replayed into another sink
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def emit(self, clock, kind, queue, **fields):
+        if queue is not None:
+            queue = QueueView(queue.names())
+        self.events.append((clock, kind, queue, fields))
+
+    def flush(self):
+        pass
+
+def replay(events, sink):
+    """
+    A method to emit events recorded by a RecordingSink to another sink
+    @param events: list of the recorded events
+    @param sink: the Sink to emit to
+    """
+    for clock, kind, queue, fields in events:
+        sink.emit(clock, kind, queue, **fields)
+
+# Sinks that can be selected from the command line
+SINKS = {'text': TextSink, 'json': JsonSink, 'null': NullSink}
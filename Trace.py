@@ -0,0 +1,97 @@
+from Process import Process
+from Workload import Workload, write_workload
+from array import array
+import argparse
+import csv
+import os
+
+def read_csv(path, tau):
+    """
+    A method to stream the processes of a CSV trace. Every line is a process:
+    its name, its arrival time and its interleaved CPU burst and IO times,
+    starting and ending with a CPU burst, e.g. 'A,9,56,220,24'. Empty lines
+    and lines starting with '#' are skipped. Only one line is read at a time.
+    CPU bursts take at least 1ms, and IO and arrival times aren't negative
+    @param path: path of the trace
+    @param tau: the initial estimate of the CPU burst time of every process
+    @return processes: generator of processes, with ids in the order of the
+    lines
+    """
+    with open(path, newline='') as f:
+        pid = 0
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].startswith('#'):
+                continue
+            try:
+                arrival = int(row[1])
+                timelist = array('i', [int(time) for time in row[2:]])
+            except (IndexError, ValueError, OverflowError):
+                raise ValueError('{}:{}: a process needs a name, an arrival time and integer times'.format(path, line))
+            if len(timelist) % 2 == 0:
+                raise ValueError('{}:{}: a process needs an odd number of times, ending with a CPU burst'.format(path, line))
+
+            if arrival < 0:
+                raise ValueError('{}:{}: the arrival time {} is negative'.format(path, line, arrival))
+
+            # A burst has to take some time, it would complete the moment it's
+            # switched in otherwise
+            if min(timelist[::2]) < 1:
+                raise ValueError('{}:{}: a CPU burst of {}ms, CPU bursts take at least 1ms'.format(path, line, min(timelist[::2])))
+            if len(timelist) > 1 and min(timelist[1::2]) < 0:
+                raise ValueError('{}:{}: an IO time of {}ms is negative'.format(path, line, min(timelist[1::2])))
+            yield Process(pid, row[0], arrival, (len(timelist) + 1) // 2, timelist, tau)
+            pid += 1
+
+def open_trace(path, tau):
+    """
+    A method to stream the processes of a trace, either a CSV trace (.csv) or
+    a binary one, i.e. a saved Workload, which is mapped instead of read. The
+    processes have to be in the order of their arrival times
+    @param path: path of the trace
+    @param tau: the initial estimate of the CPU burst time of every process
+    @return processes: iterable of processes
+    """
+    if path.endswith('.csv'):
+        return read_csv(path, tau)
+    return Workload.load(path, tau).stream()
+
+def convert(csv_path, path):
+    """
+    A method to convert a CSV trace to the binary format. The times are
+    written as they are read, so the trace doesn't have to fit in memory.
+    They are checked by read_csv, so a bad time fails the conversion
+    @param csv_path: path of the CSV trace
+    @param path: path of the binary trace
+    """
+    names = []
+    arrivals = array('i')
+    num_bursts = array('i')
+    offsets = array('q')
+
+    # The times are written one process at a time. The other arrays are
+    # filled along the way, and write_workload only writes them after the
+    # times
+    def chunks():
+        total = 0
+        for p in read_csv(csv_path, 0):
+            names.append(p.name)
+            arrivals.append(p.arrival)
+            num_bursts.append(p.num_bursts)
+            offsets.append(total)
+            total += len(p.timelist)
+            yield p.timelist
+
+    # A trace that fails the checks doesn't leave half of a binary trace
+    try:
+        with open(path, 'wb') as f:
+            write_workload(f, names, arrivals, num_bursts, offsets, chunks())
+    except BaseException:
+        os.remove(path)
+        raise
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='convert a CSV trace to the binary trace format')
+    parser.add_argument('csv', help='the CSV trace')
+    parser.add_argument('output', help='the binary trace to write')
+    args = parser.parse_args()
+    convert(args.csv, args.output)
@@ -0,0 +1,192 @@
+from Process import Process
+from array import array
+import mmap
+import os
+import struct
+
+# Header of a saved workload: the magic, the number of processes and the
+# number of times. The sections follow, each aligned to 8 bytes: the times,
+# the arrival times, the numbers of bursts, the offsets of the times of every
+# process, the offsets of their names and the names in UTF-8. The numbers are
+# in native byte order
+MAGIC = b'CPUSIMW1'
+HEADER = struct.Struct('=8sqq')
+
+def align(position):
+    """
+    A method to round a position in a file up to a multiple of 8
+    @param position: the position
+    @return position: the aligned position
+    """
+    return (position + 7) & ~7
+
+def layout(n, total):
+    """
+    A method to get where the sections of a saved workload start
+    @param n: number of processes
+    @param total: number of times of all processes
+    @return sections: dict of the start of each section, and of the end of
+    the last fixed size one
+    """
+    sections = {'times': HEADER.size}
+    sections['arrivals'] = align(sections['times'] + 4 * total)
+    sections['num_bursts'] = sections['arrivals'] + 4 * n
+    sections['offsets'] = align(sections['num_bursts'] + 4 * n)
+    sections['name_offsets'] = sections['offsets'] + 8 * n
+    sections['names'] = sections['name_offsets'] + 8 * (n + 1)
+    return sections
+
+class Workload:
+    """
+    A Workload class to hold the processes to be simulated. The times of all
+    processes are kept in one contiguous array, and it is never modified by
+    a simulation, so one workload can be simulated by every algorithm
+    """
+
+    def __init__(self, tau):
+        """
+        @param tau: the initial estimate of the CPU burst time of every process
+        """
+        self.tau = tau
+        self.names = []
+        self.arrivals = array('i')
+        self.num_bursts = array('i')
+
+        # Interleaved CPU burst and IO times of all processes, and the index
+        # where the times of each process start
+        self.times = array('i')
+        self.offsets = array('q')
+
+    def add(self, name, arrival, timelist):
+        """
+        A method to add a process to the workload. Its id is its index in the
+        workload
+        @param name: the name of the process
+        @param arrival: the arrival time of the process
+        @param timelist: the interleaved CPU burst and IO times of the process,
+        starting and ending with a CPU burst
+        """
+        self.names.append(name)
+        self.arrivals.append(arrival)
+        self.num_bursts.append((len(timelist) + 1) // 2)
+        self.offsets.append(len(self.times))
+        self.times.extend(timelist)
+
+    def processes(self):
+        """
+        A method to create the processes for one simulation. Their state starts
+        from the beginning of the workload, and they share its times
+        @return processes: list of processes
+        """
+        return [Process(i, self.names[i], self.arrivals[i], self.num_bursts[i], self.times, self.tau, self.offsets[i])
+                for i in range(len(self))]
+
+    def stream(self):
+        """
+        A method to create the processes for one simulation one at a time, in
+        the order of their ids. The processes have to be in the order of their
+        arrival times to be streamed to a simulation
+        @return processes: generator of processes
+        """
+        for i in range(len(self)):
+            yield Process(i, self.names[i], self.arrivals[i], self.num_bursts[i], self.times, self.tau, self.offsets[i])
+
+    def save(self, path):
+        """
+        A method to save the workload in the binary format that load() maps
+        @param path: path of the file
+        """
+        with open(path, 'wb') as f:
+            write_workload(f, self.names, self.arrivals, self.num_bursts, self.offsets, [self.times])
+
+    @classmethod
+    def load(cls, path, tau):
+        """
+        A method to map a workload saved by save(). Nothing is read up front:
+        the arrays of the workload are views of the mapped file
+        @param path: path of the file
+        @param tau: the initial estimate of the CPU burst time of every process
+        @return workload: the Workload
+        """
+        # A file that is too short for its header or its sections, e.g. one
+        # cut off by a full disk, isn't a workload either
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise ValueError('{} is too short to be a saved workload'.format(path))
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, total = HEADER.unpack_from(data)
+        if magic != MAGIC or n < 0 or total < 0:
+            raise ValueError('{} is not a saved workload'.format(path))
+        sections = layout(n, total)
+        view = memoryview(data)
+        if len(data) < sections['names']:
+            raise ValueError('{} is truncated'.format(path))
+        name_offsets = view[sections['name_offsets']:sections['names']].cast('q')
+        if name_offsets[0] != 0 or not 0 <= name_offsets[n] <= len(data) - sections['names']:
+            raise ValueError('{} is truncated'.format(path))
+        workload = cls(tau)
+        workload.times = view[sections['times']:sections['times'] + 4 * total].cast('i')
+        workload.arrivals = view[sections['arrivals']:sections['arrivals'] + 4 * n].cast('i')
+        workload.num_bursts = view[sections['num_bursts']:sections['num_bursts'] + 4 * n].cast('i')
+        workload.offsets = view[sections['offsets']:sections['offsets'] + 8 * n].cast('q')
+        workload.names = MappedNames(name_offsets, view[sections['names']:])
+        return workload
+
+    def __len__(self):
+        """
+        Method to get the number of processes
+        @return len: number of processes
+        """
+        return len(self.names)
+
+class MappedNames:
+    """
+    A MappedNames class for the names of a mapped workload. A name is only
+    decoded when it is asked for
+    """
+
+    def __init__(self, offsets, blob):
+        """
+        @param offsets: the n + 1 offsets of the names in blob
+        @param blob: the UTF-8 names, one after the other
+        """
+        self.offsets = offsets
+        self.blob = blob
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+def write_workload(f, names, arrivals, num_bursts, offsets, chunks):
+    """
+    A method to write a workload in the binary format of Workload.save. The
+    times can be written in chunks, e.g. while a trace is being read, and the
+    header is written last
+    @param f: the binary file object, at its beginning
+    @param names: the names of the processes
+    @param arrivals: array('i') of the arrival times
+    @param num_bursts: array('i') of the numbers of bursts
+    @param offsets: array('q') of the index of the first time of every process
+    @param chunks: iterable of array('i') of the times, in order
+    """
+    f.write(bytes(HEADER.size))
+    total = 0
+    for chunk in chunks:
+        chunk.tofile(f)
+        total += len(chunk)
+    sections = layout(len(names), total)
+    f.write(bytes(sections['arrivals'] - f.tell()))
+    arrivals.tofile(f)
+    num_bursts.tofile(f)
+    f.write(bytes(sections['offsets'] - f.tell()))
+    offsets.tofile(f)
+    encoded = [name.encode('utf-8') for name in names]
+    name_offsets = array('q', [0])
+    for name in encoded:
+        name_offsets.append(name_offsets[-1] + len(name))
+    name_offsets.tofile(f)
+    f.write(b''.join(encoded))
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, len(names), total))
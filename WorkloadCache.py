@@ -0,0 +1,94 @@
+from Workload import MAGIC, Workload
+import hashlib
+import os
+import tempfile
+
+class WorkloadCache:
+    """
+    A WorkloadCache class that keeps generated workloads on disk, in the
+    binary format of Workload.save, so that a run with the same generator
+    parameters maps the workload instead of generating it again. The cache is
+    kept under a size bound by evicting the least recently used workloads
+    """
+
+    def __init__(self, directory, max_bytes):
+        """
+        @param directory: the directory of the cache. It is created if needed
+        @param max_bytes: the size bound of the cache in bytes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        """
+        A method to get the file of a workload
+        @param key: tuple of the generator parameters of the workload
+        @return path: path of the file
+        """
+        # The format is part of the key, so files of an older format are
+        # never mapped
+        digest = hashlib.sha1(repr((MAGIC, key)).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, 'workload-{}.bin'.format(digest))
+
+    def get(self, key, tau, generate):
+        """
+        A method to get a workload, from the cache if it's there, otherwise
+        generating and adding it
+        @param key: tuple of the generator parameters of the workload
+        @param tau: the initial estimate of the CPU burst time of every process
+        @param generate: function without arguments that generates the
+        workload
+        @return workload: the Workload
+        """
+        path = self.path(key)
+        try:
+            workload = Workload.load(path, tau)
+        except (FileNotFoundError, ValueError):
+            pass
+        else:
+            # Mark the workload as used. Eviction goes by modification time
+            os.utime(path)
+            return workload
+
+        # The workload is written to a temporary file first and renamed, so
+        # that concurrent runs never map half of a file
+        workload = generate()
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            workload.save(temporary)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.evict(keep=path)
+        return workload
+
+    def evict(self, keep=None):
+        """
+        A method to remove the least recently used workloads until the cache
+        fits its size bound
+        @param keep: path of a workload that is never removed, e.g. the one
+        just added
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith('workload-') and entry.name.endswith('.bin'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        size = sum(entry[1] for entry in entries)
+        for mtime, file_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= file_size
@@ -0,0 +1,189 @@
+from project import ALGORITHMS, LogLevel, Naming, create_processes, create_workload, parsing, run_algorithm
+from Rand48 import Rand48, numpy
+from Sink import NullSink
+from multiprocessing import Pool
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def peak_rss():
+    """
+    A method to get the peak resident set size of this process
+    @return rss: peak RSS in MB, or None where it can't be measured
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return rss / (1 << 20) if sys.platform == 'darwin' else rss / (1 << 10)
+
+def run_case(case):
+    """
+    A method to time one case. It runs in a fresh worker process, so the peak
+    RSS is the one of this case alone
+    @param case: dict of the case: the algorithm, or 'create' for
+    create_processes, and the parameters of the configuration
+    @return result: the case with its seconds, peak RSS, and for an algorithm
+    its number of events, simulated time and their rates
+    """
+    argv = [str(case[parameter]) for parameter in ('n', 'seed', 'Lambda', 'max', 'tcs', 'alpha', 'tslice', 'rradd')]
+    args = parsing(argv)
+    result = dict(case)
+    if case['algorithm'] == 'create':
+        start = time.perf_counter()
+        create_processes(Rand48(args.seed, args.Lambda, args.max), args.n, 1/args.Lambda, Naming.LETTERS)
+        result['seconds'] = time.perf_counter() - start
+    else:
+        workload = create_workload(Rand48(args.seed, args.Lambda, args.max), args.n, 1/args.Lambda)
+        processes = workload.processes()
+        start = time.perf_counter()
+        metrics = run_algorithm(processes, case['algorithm'], args, None, NullSink(), LogLevel.NONE)
+        result['seconds'] = time.perf_counter() - start
+        result['events'] = metrics['events']
+        result['ticks'] = metrics['time']
+        result['events_per_sec'] = metrics['events'] / result['seconds']
+        result['ticks_per_sec'] = metrics['time'] / result['seconds']
+    result['peak_rss_mb'] = peak_rss()
+    return result
+
+def series(args):
+    """
+    A method to build the series of the benchmark. A series is timed for every
+    size, and RR has one series per rradd
+    @param args: a NameSpace containing all argument values of the benchmark
+    @return series: list of dicts of the parameters of every series, without n
+    """
+    all_series = []
+    for Lambda in args.Lambda:
+        for max in args.max:
+            common = {'seed': args.seed, 'Lambda': Lambda, 'max': max, 'tcs': args.tcs, 'alpha': args.alpha, 'tslice': args.tslice}
+            all_series.append(dict(common, algorithm='create', rradd='END'))
+            for algorithm in ALGORITHMS:
+                for rradd in (args.rradd if algorithm == 'RR' else ['END']):
+                    all_series.append(dict(common, algorithm=algorithm, rradd=rradd))
+    return all_series
+
+def exponent(results):
+    """
+    A method to fit seconds = c * n ** k to the results of a series, by least
+    squares on the logarithms. Cases shorter than a millisecond are left out,
+    they are mostly overhead
+    @param results: the results of the series
+    @return k: the scaling exponent, or None with fewer than two cases
+    """
+    points = [(math.log(result['n']), math.log(result['seconds'])) for result in results if result['seconds'] >= 1e-3]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, y in points) / len(points)
+    mean_y = sum(y for x, y in points) / len(points)
+    sxx = sum((x - mean_x) ** 2 for x, y in points)
+    if sxx == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+
+def revision():
+    """
+    A method to get the git revision of the simulator
+    @return revision: the commit hash, or None outside of a git checkout
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def key(result):
+    """
+    A method to identify a case across revisions
+    @param result: the result of the case
+    @return key: tuple of the algorithm and parameters
+    """
+    return (result['algorithm'], result['n'], result['Lambda'], result['max'], result['rradd'])
+
+def compare(results, path):
+    """
+    A method to print the speedup of every case over the same case of earlier
+    results
+    @param results: the results of this run
+    @param path: the JSON file of the earlier results
+    """
+    with open(path) as f:
+        before = {key(result): result for result in json.load(f)['results']}
+    print('{:>8} {:>8} {:>8} {:>7} {:>10} {:>10} {:>10} {:>8}'.format('case', 'n', 'Lambda', 'max', 'rradd', 'before', 'now', 'speedup'))
+    for result in results:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        print('{:>8} {:>8} {:>8} {:>7} {:>10} {:>9.4f}s {:>9.4f}s {:>7.2f}x'.format(
+            result['algorithm'], result['n'], result['Lambda'], result['max'], result['rradd'],
+            old['seconds'], result['seconds'], old['seconds'] / result['seconds']))
+
+def main():
+    """
+    Time every series for every size, growing n until a case would take longer
+    than the budget, then print the results and scaling exponents and save
+    them as JSON
+    """
+    parser = argparse.ArgumentParser(description='simulator benchmark: times create_processes and every algorithm across numbers of processes, and fits how the time scales with n')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 10, 100, 1000, 10000, 100000], help='numbers of processes, in increasing order')
+    parser.add_argument('--Lambda', nargs='+', default=['0.01', '0.001'], help='inverses of the average of the exponential distribution')
+    parser.add_argument('--max', nargs='+', default=['256', '3000'], help='upper bounds for random numbers')
+    parser.add_argument('--rradd', nargs='+', default=['END', 'BEGINNING'], help='END and/or BEGINNING for RR')
+    parser.add_argument('--seed', default='2', help='the seed for the random number generator')
+    parser.add_argument('--tcs', default='4', help='time required for context switch')
+    parser.add_argument('--alpha', default='0.5', help='constant for exponential averaging for SJF & SRT')
+    parser.add_argument('--tslice', default='128', help='time slice for RR')
+    parser.add_argument('--budget', type=float, default=60, help='seconds a case may take. A series stops growing n once its next case is expected to take longer, assuming linear scaling. The default is 60')
+    parser.add_argument('-o', '--output', default='bench.json', help='JSON file to save the results to. The default is bench.json')
+    parser.add_argument('--compare', help='JSON file of earlier results to compare with, e.g. of another revision')
+    args = parser.parse_args()
+
+    results = []
+    exponents = []
+    print('{:>8} {:>8} {:>8} {:>7} {:>10} {:>10} {:>12} {:>12} {:>9}'.format('case', 'n', 'Lambda', 'max', 'rradd', 'seconds', 'events/s', 'ticks/s', 'RSS MB'))
+
+    # Every case runs in a worker of its own, one at a time so they don't
+    # compete for the CPU
+    with Pool(processes=1, maxtasksperchild=1) as pool:
+        for parameters in series(args):
+            timed = []
+            for i, n in enumerate(args.sizes):
+                result = pool.apply(run_case, (dict(parameters, n=n),))
+                timed.append(result)
+                print('{:>8} {:>8} {:>8} {:>7} {:>10} {:>9.4f}s {:>12} {:>12} {:>9}'.format(
+                    result['algorithm'], n, result['Lambda'], result['max'], result['rradd'], result['seconds'],
+                    '{:.0f}'.format(result['events_per_sec']) if 'events' in result else '-',
+                    '{:.0f}'.format(result['ticks_per_sec']) if 'ticks' in result else '-',
+                    '{:.1f}'.format(result['peak_rss_mb']) if result['peak_rss_mb'] is not None else '-'), flush=True)
+                if i + 1 < len(args.sizes) and result['seconds'] * args.sizes[i + 1] / n > args.budget:
+                    break
+            results.extend(timed)
+            exponents.append(dict(parameters, exponent=exponent(timed)))
+
+    print('\nscaling exponents, seconds ~ n ** k')
+    for entry in exponents:
+        k = entry['exponent']
+        print('{:>8} {:>8} {:>7} {:>10} {:>8}'.format(entry['algorithm'], entry['Lambda'], entry['max'], entry['rradd'],
+                                                   '{:.2f}'.format(k) if k is not None else '-'))
+
+    with open(args.output, 'w') as f:
+        json.dump({'revision': revision(), 'python': platform.python_version(), 'platform': platform.platform(),
+                   'numpy': numpy is not None, 'results': results, 'exponents': exponents}, f, indent=1)
+
+    if args.compare:
+        print()
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
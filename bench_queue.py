@@ -0,0 +1,72 @@
+from Queue import Queue
+import argparse
+import time
+
+class ListQueue():
+    """
+    The list-backed FIFO queue that Queue used before, kept here only as the
+    baseline of the benchmark
+    """
+
+    def __init__(self):
+        self.container = []
+
+    def push(self, obj):
+        self.container.append(obj)
+
+    def pop(self):
+        return self.container.pop(0)
+
+    def __len__(self):
+        return len(self.container)
+
+def fill_and_drain(queue, n):
+    """
+    A method to time pushing n items into a queue and then popping all of them
+    @param queue: the queue to be timed
+    @param n: number of items
+    @return seconds: time taken to push and pop all items
+    """
+    start = time.perf_counter()
+    for i in range(n):
+        queue.push(i)
+    while len(queue):
+        queue.pop()
+    return time.perf_counter() - start
+
+def dispatch(queue, n, rounds):
+    """
+    A method to time dispatching from a queue that holds n items, i.e. one pop
+    followed by one push, the way RR and FCFS use the ready queue
+    @param queue: the queue to be timed
+    @param n: number of items held in the queue
+    @param rounds: number of pop/push pairs
+    @return seconds: time taken per pop/push pair
+    """
+    for i in range(n):
+        queue.push(i)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        queue.push(queue.pop())
+    return (time.perf_counter() - start) / rounds
+
+def main():
+    """
+    Run both benchmarks for every size and print the timings side by side
+    """
+    parser = argparse.ArgumentParser(description='ready queue micro-benchmark')
+    parser.add_argument('sizes', type=int, nargs='*', default=[10000, 100000], help='numbers of queued items')
+    parser.add_argument('--rounds', type=int, default=10000, help='pop/push pairs for the dispatch benchmark')
+    args = parser.parse_args()
+
+    print('{:>8} {:>12} {:>12} {:>14} {:>14}'.format('items', 'list drain', 'deque drain', 'list dispatch', 'deque dispatch'))
+    for n in args.sizes:
+        print('{:>8} {:>11.4f}s {:>11.4f}s {:>12.3f}us {:>12.3f}us'.format(
+            n,
+            fill_and_drain(ListQueue(), n),
+            fill_and_drain(Queue(), n),
+            dispatch(ListQueue(), n, args.rounds) * 1e6,
+            dispatch(Queue(), n, args.rounds) * 1e6))
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,18 @@
 from enum import Enum
-from Rand48 import Rand48
-from Process import Process
-from Queue import Queue
+from Rand48 import Rand48, Rand48Stream, numpy
+from Workload import Workload
+from Trace import open_trace
+from WorkloadCache import WorkloadCache
+from Scheduler import Policy, SJFPolicy, SRTPolicy, RRPolicy, schedule, schedule_variants
+from Sink import SINKS, NullSink, RecordingSink, replay
+from Simout import SIMOUTS, format_metrics
+from Profiler import Profiler
+from Checkpoint import Checkpoint, load as load_snapshot
+from concurrent.futures import ProcessPoolExecutor
 import argparse
+import cProfile
 import math
-import copy
+import sys
 
 class Precedence(Enum):
     """
@@ -13,9 +21,37 @@ class Precedence(Enum):
     END = 'END'
     BEGINNING = 'BEGINNING'
 
-def parsing():
+class Naming(Enum):
+    """
+    A naming enum for parsing. LETTERS names the processes A-Z, then AA, AB
+    and so on, NUMERIC names them by their ids 0, 1, 2...
+    """
+    LETTERS = 'letters'
+    NUMERIC = 'numeric'
+
+class ReadyQueues(Enum):
+    """
+    A ready queue enum for parsing. GLOBAL has one ready queue shared by all
+    CPUs, PER_CPU gives every CPU its own ready queue, and idle CPUs steal
+    from the others
+    """
+    GLOBAL = 'global'
+    PER_CPU = 'per-cpu'
+
+class LogLevel(Enum):
+    """
+    A log level enum for parsing. NONE logs nothing and only writes the
+    metrics, TRUNCATED logs the detailed events before time 1000ms only, FULL
+    logs every event
+    """
+    NONE = 'none'
+    TRUNCATED = 'truncated'
+    FULL = 'full'
+
+def parsing(argv=None):
     """
     A method to parse all arguments
+    @param argv: list of the arguments, the command line arguments if None
     @return args: a NameSpace containing all argument values 
     """
     parser = argparse.ArgumentParser(description='opsys simulation project')
@@ -27,18 +63,73 @@ def parsing():
     parser.add_argument('alpha', type=float, help='constant for exponential averaging for SJF & SRT')
     parser.add_argument('tslice', type=float, help='time slice for RR')
     parser.add_argument('rradd', type=Precedence, help='whether processes are added to the END or BEGINNING in RR. The default is END', default='END', nargs='?')
-    return parser.parse_args()
+    parser.add_argument('--trace', help='CSV (.csv) or binary trace of the processes to simulate, sorted by arrival time, instead of generating them. n, seed and max are then ignored')
+    parser.add_argument('--cache', help='directory of a cache of generated workloads. A workload with the same n, seed, Lambda, max and names is mapped from the cache instead of being generated')
+    parser.add_argument('--cache-size', type=int, help='size bound of the workload cache in MB, the least recently used workloads are evicted. The default is 1024', default=1024)
+    parser.add_argument('--names', type=Naming, help='letters (A-Z, AA, AB...) or numeric names of the processes. The default is letters', default=Naming.LETTERS)
+    parser.add_argument('--simout-format', choices=list(SIMOUTS), help='format of the metrics: text (simout.txt), json (JSON Lines, simout.jsonl) or csv (simout.csv). The default is text', default='text')
+    parser.add_argument('--per-process', action='store_true', help='add a summary of every process to the metrics: its wait, turnaround and response time and number of preemptions. With csv they go to simout-processes.csv')
+    parser.add_argument('--profile', action='store_true', help='count and time every phase of the simulation loop and print the breakdown of every algorithm to stderr')
+    parser.add_argument('--pstats', metavar='PREFIX', help='profile every algorithm with cProfile and dump its stats to PREFIX-<algorithm>.pstats')
+    parser.add_argument('--checkpoint', metavar='PATH', help='write a snapshot of the run to PATH now and then, so that it can be resumed with --resume if it is interrupted. It is removed once the run is complete')
+    parser.add_argument('--checkpoint-every', type=float, metavar='SECONDS', help='seconds between two snapshots. The default is 60', default=60)
+    parser.add_argument('--resume', metavar='PATH', help='resume an interrupted run from its snapshot, given the same arguments. The event log continues from the snapshot, and snapshots keep being written to --checkpoint, or to PATH')
+    parser.add_argument('--sink', choices=list(SINKS), help='format of the event log: text, json (JSON Lines) or null. The default is text', default='text')
+    parser.add_argument('--jobs', type=int, help='number of worker processes to run the algorithms in parallel. The default is 1', default=1)
+    parser.add_argument('--cpus', type=int, help='number of CPUs. The default is 1', default=1)
+    parser.add_argument('--queues', type=ReadyQueues, help='global (one ready queue shared by all CPUs) or per-cpu ready queues with work stealing. The default is global', default=ReadyQueues.GLOBAL)
+    parser.add_argument('--log-level', type=LogLevel, help='none, truncated or full event log. The default is truncated, or full when running with -O', default=LogLevel.TRUNCATED if __debug__ else LogLevel.FULL)
+    args = parser.parse_args(argv)
+    if (args.checkpoint or args.resume) and args.jobs > 1:
+        parser.error('--checkpoint and --resume need --jobs 1')
+    if args.cpus < 1:
+        parser.error('--cpus must be at least 1')
+    return args
+
+def process_name(pid, naming=Naming.LETTERS):
+    """
+    A method to get the name of a process from its id
+    @param pid: the id of the process, starting from 0
+    @param naming: the Naming of the processes
+    @return name: A-Z for ids 0-25, then AA, AB... like spreadsheet columns, or
+    the id itself for numeric names
+    """
+    if naming == Naming.NUMERIC:
+        return str(pid)
+    name = ''
+    pid += 1
+    while pid:
+        pid, letter = divmod(pid - 1, 26)
+        name = chr(ord('A') + letter) + name
+    return name
+
+def create_workload(rand, n,tau, naming=Naming.LETTERS):
+    """
+    A method to create the workload of all processes once and for all.
+    @param rand: rand48 generator
+    @param n: number of processes needed to be generated
+    @param tau: the initial estimate of the CPU burst time
+    @param naming: the Naming of the processes
+    @return workload: Workload of the processes generated
+    """
+    # With NumPy the random numbers are generated in blocks. Both ways give
+    # exactly the same workload
+    if numpy is not None:
+        return create_workload_batched(rand, n, tau, naming)
+    return create_workload_scalar(rand, n, tau, naming)
 
-def create_processes(rand, n,tau):
+def create_workload_scalar(rand, n, tau, naming=Naming.LETTERS):
     """
-    A method to create all processes objects once and for all.
+    A method to create the workload like create_workload, drawing the random
+    numbers one at a time
     @param rand: rand48 generator
     @param n: number of processes needed to be generated
-    @return processes: list of processes generated
+    @param tau: the initial estimate of the CPU burst time
+    @param naming: the Naming of the processes
+    @return workload: Workload of the processes generated
     """
-    name = 'A'
-    processes = []
-    for _ in range(n):
+    workload = Workload(int(tau))
+    for pid in range(n):
         arrival = math.floor(rand.next_exp())
         num_bursts = math.ceil(rand.drand48() * 100)
         timelist = []
@@ -46,946 +137,397 @@ def create_processes(rand, n,tau):
             timelist.append(math.ceil(rand.next_exp()))
             timelist.append(math.ceil(rand.next_exp()) * 10)
         timelist.append(math.ceil(rand.next_exp()))
-        processes.append(Process(name, arrival, num_bursts, timelist,int(tau)))
-        name = chr(ord(name) + 1)
-    return processes
-def FCFS(processes, tcs, simout):
+        workload.add(process_name(pid, naming), arrival, timelist)
+    return workload
+
+def create_workload_batched(rand, n, tau, naming=Naming.LETTERS):
+    """
+    A method to create the workload like create_workload, drawing the random
+    numbers from a Rand48Stream. All times of a process are drawn at once
+    @param rand: rand48 generator
+    @param n: number of processes needed to be generated
+    @param tau: the initial estimate of the CPU burst time
+    @param naming: the Naming of the processes
+    @return workload: Workload of the processes generated
+    """
+    stream = Rand48Stream(rand)
+    workload = Workload(int(tau))
+    for pid in range(n):
+        arrival = math.floor(stream.next_exp())
+        num_bursts = math.ceil(stream.drand48() * 100)
+
+        # CPU bursts are at even indices and IO at odd indices
+        timelist = numpy.ceil(stream.next_exps(2 * num_bursts - 1)).astype(numpy.int64)
+        timelist[1::2] *= 10
+        workload.add(process_name(pid, naming), arrival, timelist.tolist())
+    stream.sync()
+    return workload
+
+def create_processes(rand, n,tau, naming=Naming.LETTERS):
+    """
+    A method to create all processes objects once and for all.
+    @param rand: rand48 generator
+    @param n: number of processes needed to be generated
+    @param naming: the Naming of the processes
+    @return processes: list of processes generated
+    """
+    return create_workload(rand, n, tau, naming).processes()
+
+def log_horizon(log_level):
+    """
+    A method to get the time before which the detailed events are logged
+    @param log_level: the LogLevel of the simulation
+    @return time: 0 if nothing is logged, 1000 for a truncated log and
+    infinity for a full log
+    """
+    if log_level == LogLevel.NONE:
+        return 0
+    if log_level == LogLevel.TRUNCATED:
+        return 1000
+    return math.inf
+
+def run_policy(processes, policy, tcs, simout, sink, log_level, cpus=1, per_cpu=False, summaries=False, profiler=None, checkpoint=None):
+    """
+    A method to simulate a policy and write its metrics to simout
+    @param processes: list of processes to be scheduled
+    @param policy: the Policy of the algorithm
+    @param tcs: time required to perform **HALF** context switches
+    @param simout: the out file object, or None to not write the metrics
+    @param sink: the Sink that the events are emitted to
+    @param log_level: the LogLevel of the event log
+    @param cpus: number of CPUs
+    @param per_cpu: whether every CPU has its own ready queue
+    @param summaries: whether to summarize every process in the metrics
+    @param profiler: the Profiler of the simulation loop, or None
+    @param checkpoint: the Checkpoint of the run, or None
+    @return metrics: dict of the metrics that are also written to simout
+    """
+    metrics = schedule(processes, policy, tcs, sink, log_level != LogLevel.NONE, log_horizon(log_level), cpus, per_cpu, summaries, profiler, checkpoint)
+    if simout is not None:
+        simout.write(format_metrics(policy.name, metrics))
+    return metrics
+
+def FCFS(processes, tcs, simout, sink, log_level=LogLevel.TRUNCATED, cpus=1, per_cpu=False, summaries=False, profiler=None, checkpoint=None):
     """
     The FCFS algorithm
     @param processes: list of processes to be scheduled
     @param tcs: time required to perform **HALF** context switches, i.e. time
     needed to for either switching in or switching out
-    @param simout: the out file object
-    """
-
-    # print all processes
-    for p in processes:
-        s = 's'
-        if p.num_bursts == 1:
-            s = ''
-        print('Process', p.name, '[NEW] (arrival time', p.arrival, 'ms)', p.num_bursts, 'CPU burst{}'.format(s))
-
-########################## Variable Initialization #############################
-
-    # clock for counting time
-    clock = 0 
-
-    # queue of FCFS, could be changed to accommodate priority queue
-    queue = Queue()
-
-    # List of processes before arrival
-    pre_arrival = [] 
-
-    # List of processes currently doing IO. Note that this list must be sorted
-    # at all times
-    ios = []
-
-    # Current bursting process. If the CPU is idle, this variable is set to None
-    bursting = None
-
-    # Indicates whether the CPU is doing the first half of the context switch
-    switch_in = False
-
-    # Indicates whether the CPU is doing the second half of the context switch
-    switch_out = False
-
-    # Preparation counter for context switch. If preparation == 0, context
-    # switch is done
-    preparation = tcs
-
-    # The process that's going to IO. After a process ends its CPU burst, it's
-    # "going" to IO, but it only actually goes to IO after the context switch
-    # is done
-    to_io = None
-
-    # List of burst times to calculate the metrics
-    burst_time = []
-
-################################## Overhead ####################################
-
-    print('time 0ms: Simulator started for FCFS', queue)
-
-    # Put all processes to either the queue (if arrival time is 0) or the
-    # pre_arrival list
-    for p in processes:
-        if p.arrival == 0:
-            queue.push(p)
-            print('time {}ms: Process {} arrived; placed on ready queue'.format(clock, p.name), queue)
-        else:
-            pre_arrival.append(p)
-
-    # Select a process to burst if the queue is not empty
-    if len(queue) != 0:
-        bursting = queue.pop()
-        bursting.wait.append(0)
-        switch_in = True
-        preparation = tcs - 1
-
-################################# Simulation ###################################
-
-    while (True):
-        """
-        The workflow:
-        1. taking out a process from bursting
-        2. add a new process to burst
-        3. check for any completed IO
-        4. check for any process arrival
-        For ties in any of the above events, break with names in alphabetical
-        order, i.e. Process A is should finish IO ahead of Process B
-        """
-        
-        # Increment time first
-        clock += 1
-
-        # Do a CPU burst
-        if bursting != None and (not switch_in):
-            bursting.timelist[0] -= 1
-            burst_time[-1] += 1
-            
-            # If a process finished bursting, check if the process is
-            # terminating. If not, put it to IO. Also turns on context switches.
-            if bursting.timelist[0] == 0:
-                bursting.timelist.pop(0)
-                bursting.num_bursts -= 1
-                if bursting.num_bursts == 0:
-                    print('time {}ms: Process {} terminated'.format(clock, bursting.name), queue)
-                else:
-                    s = 's'
-                    if bursting.num_bursts == 1:
-                        s = ''
-                    if clock < 1000 or not __debug__:
-                        print('time {}ms: Process {} completed a CPU burst; {} burst{} to go'.format(clock, bursting.name, bursting.num_bursts, s), queue)
-                        print('time {}ms: Process {} switching out of CPU; will block on I/O until time {}ms'.format(clock, bursting.name, clock + bursting.timelist[0] + tcs), queue)
-                    to_io = bursting
-                switch_out = True
-                preparation = tcs + 1
-                bursting = None
-
-        # Doing context switch and if context switch done, put a process into
-        # bursting
-        if switch_in:
-            if preparation != 0:
-                preparation -= 1
-            else:
-                switch_in = False
-                burst_time.append(0)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} started using the CPU for {}ms burst'.format(clock, bursting.name, bursting.timelist[0]), queue)
-        
-        # Do IO for each process and check if any process completed IO. Note
-        # that the IO list must always be in alphabetical order
-        remove = []
-        for p in ios:
-            p.timelist[0] -= 1
-            if p.timelist[0] == 0:
-                p.timelist.pop(0)
-                queue.push(p)
-                p.wait.append(0)
-                remove.append(p)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} completed I/O; placed on ready queue'.format(clock, p.name), queue)
-        for p in remove:
-            ios.remove(p)
-        ios.sort()
-
-        # Decrement arrival time and check if any process arrives
-        remove.clear()
-        for p in pre_arrival:
-            p.arrival -= 1
-            if p.arrival == 0:
-                queue.push(p)
-                p.wait.append(0)
-                remove.append(p)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} arrived; placed on ready queue'.format(clock, p.name), queue)
-        for p in remove:
-            pre_arrival.remove(p)
-
-        # Doing switch out. If done, put a process into IO.
-        if switch_out:
-            preparation -= 1
-            if preparation == 0:
-                switch_out = False
-                if to_io != None:
-                    ios.append(to_io)
-                    ios.sort()
-                to_io = None
-
-        # If the CPU is idle and the queue is not empty, pop the queue and start
-        # switching in
-        if bursting == None and len(queue) != 0 and (not switch_out) and (not switch_in):
-            bursting = queue.pop()
-            switch_in = True
-            preparation = tcs - 1
-
-        # For each process that's still in the queue, increment its wait time
-        # for metrics calculation
-        for p in queue:
-            p.wait[-1] += 1
-
-        # If there isn't a process anywhere, break the simulation, and directly
-        # add tcs to the clock to account for the final context switch
-        if len(pre_arrival) == 0 and len(ios) == 0 and bursting == None and len(queue) == 0 and to_io == None:
-            print('time {}ms: Simulator ended for FCFS'.format(clock + tcs), queue,'\n')
-            break
-
-############################# metrics calculation ##############################
-
-    # Calculate average burst time
-    avg_burst = sum(burst_time) / len(burst_time)
-
-    # Calculate average wait time by appending all wait times from all processes
-    # together, then get the average
-    avg_wait = []
-    for p in processes:
-        avg_wait += p.wait
-    avg_wait = sum(avg_wait) / len(avg_wait)
-
-    # Create the metrics data. 
-    # Note that avg_turnaround = avg_burst + avg_wait + tcs * 2
-    # Here FCFS doesn't have preemptions.
-    data = 'Algorithm FCFS\n' + \
-           '-- average CPU burst time: {:.3f} ms\n'.format(avg_burst) + \
-           '-- average wait time: {:.3f} ms\n'.format(avg_wait) + \
-           '-- average turnaround time: {:.3f} ms\n'.format(avg_burst + avg_wait + tcs * 2) + \
-           '-- total number of context switches: {}\n'.format(len(burst_time)) + \
-           '-- total number of preemptions: 0\n' + \
-           '-- CPU utilization: {:.3f}%\n'.format(sum(burst_time) / (clock + tcs) * 100)
-    simout.write(data)
-def tau_function(process,alpha):
-    tau=math.ceil((1-alpha)*process.tau+alpha*process.cpu_time)
-    return int(tau)
-def SJF(processes, tcs, simout,lamb,alpha):
+    @param simout: the out file object, or None to not write the metrics
+    @param sink: the Sink that the events are emitted to
+    @param log_level: the LogLevel of the event log
+    @param cpus: number of CPUs
+    @param per_cpu: whether every CPU has its own ready queue
+    @param summaries: whether to summarize every process in the metrics
+    @param profiler: the Profiler of the simulation loop, or None
+    @param checkpoint: the Checkpoint of the run, or None
+    @return metrics: dict of the metrics that are also written to simout
+    """
+    return run_policy(processes, Policy(), tcs, simout, sink, log_level, cpus, per_cpu, summaries, profiler, checkpoint)
+
+def SJF(processes, tcs, simout, sink, lamb, alpha, log_level=LogLevel.TRUNCATED, cpus=1, per_cpu=False, summaries=False, profiler=None, checkpoint=None):
     """
     The SJF algorithm
     @param processes: list of processes to be scheduled
     @param tcs: time required to perform **HALF** context switches, i.e. time
     needed to for either switching in or switching out
-    @param simout: the out file object
-    """
-
-    # print all processes
-    for p in processes:
-        s = 's'
-        if p.num_bursts == 1:
-            s = ''
-        print('Process', p.name, '[NEW] (arrival time', p.arrival, 'ms)', p.num_bursts, 'CPU burst{} (tau {}ms)'.format(s,int(1/lamb)))
-
-########################## Variable Initialization #############################
-
-    # clock for counting time
-    clock = 0 
-
-    # queue of FCFS, could be changed to accommodate priority queue
-    queue = Queue('pq')
-
-    # List of processes before arrival
-    pre_arrival = [] 
-
-    # List of processes currently doing IO. Note that this list must be sorted
-    # at all times
-    ios = []
-
-    # Current bursting process. If the CPU is idle, this variable is set to None
-    bursting = None
-
-    # Indicates whether the CPU is doing the first half of the context switch
-    switch_in = False
-
-    # Indicates whether the CPU is doing the second half of the context switch
-    switch_out = False
-
-    # Preparation counter for context switch. If preparation == 0, context
-    # switch is done
-    preparation = tcs
-
-    # The process that's going to IO. After a process ends its CPU burst, it's
-    # "going" to IO, but it only actually goes to IO after the context switch
-    # is done
-    to_io = None
-
-    # List of burst times to calculate the metrics
-    burst_time = []
-
-################################## Overhead ####################################
-
-    print('time 0ms: Simulator started for SJF', queue)
-
-    # Put all processes to either the queue (if arrival time is 0) or the
-    # pre_arrival list
-    for p in processes:
-        if p.arrival == 0:
-            p.tau=int(1/lamb)
-            queue.push((p.tau,p))
-            print('time {}ms: Process {} (tau {}ms) arrived; placed on ready queue'.format(clock, p.name,p.tau), queue)
-        else:
-            pre_arrival.append(p)
-
-    # Select a process to burst if the queue is not empty
-    if len(queue) != 0:
-        bursting = queue.pop()[1]
-        bursting.wait.append(0)
-        switch_in = True
-        preparation = tcs - 1
-
-################################# Simulation ###################################
-
-    while (True):
-        """
-        The workflow:
-        1. taking out a process from bursting
-        2. add a new process to burst
-        3. check for any completed IO
-        4. check for any process arrival
-
-        For ties in any of the above events, break with names in alphabetical
-        order, i.e. Process A is should finish IO ahead of Process B
-        """
-        
-        # Increment time first
-        clock += 1
-
-        # Do a CPU burst
-        if bursting != None and (not switch_in):
-            bursting.timelist[0] -= 1
-            bursting.cpu_time += 1
-            burst_time[-1] += 1
-            
-            # If a process finished bursting, check if the process is
-            # terminating. If not, put it to IO. Also turns on context switches.
-            if bursting.timelist[0] == 0:
-                bursting.timelist.pop(0)
-                bursting.num_bursts -= 1
-                if bursting.num_bursts == 0:
-                    print('time {}ms: Process {} terminated'.format(clock, bursting.name), queue)
-                else:
-                    s = 's'
-                    if bursting.num_bursts == 1:
-                        s = ''
-                    new_tau = tau_function(bursting,alpha)
-                    if clock < 1000 or not __debug__:
-                        print('time {}ms: Process {} (tau {}ms) completed a CPU burst; {} burst{} to go'.format(clock, bursting.name, bursting.tau,bursting.num_bursts, s), queue)
-                        print('time {}ms: Recalculated tau ({}ms) for process {}'.format(clock,new_tau,bursting.name),queue)
-                        print('time {}ms: Process {} switching out of CPU; will block on I/O until time {}ms'.format(clock, bursting.name, clock + bursting.timelist[0] + tcs), queue)
-                    bursting.tau=new_tau
-                    to_io = bursting
-                switch_out = True
-                bursting.cpu_time = 0
-                preparation = tcs + 1
-                bursting = None
-
-        # Doing context switch and if context switch done, put a process into
-        # bursting
-        if switch_in:
-            if preparation != 0:
-                preparation -= 1
-            else:
-                switch_in = False
-                burst_time.append(0)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} (tau {}ms) started using the CPU for {}ms burst'.format(clock,bursting.name,bursting.tau, bursting.timelist[0]), queue)
-        
-        # Do IO for each process and check if any process completed IO. Note
-        # that the IO list must always be in alphabetical order
-        remove = []
-        for p in ios:
-            p.timelist[0] -= 1
-            if p.timelist[0] == 0:
-                p.timelist.pop(0)
-                queue.push((p.tau,p))
-                p.wait.append(0)
-                remove.append(p)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} (tau {}ms) completed I/O; placed on ready queue'.format(clock, p.name,p.tau), queue)
-        for p in remove:
-            ios.remove(p)
-        ios.sort()
-
-        # Decrement arrival time and check if any process arrives
-        remove.clear()
-        for p in pre_arrival:
-            p.arrival -= 1
-            if p.arrival == 0:
-                p.tau=int(1/lamb)
-                queue.push((p.tau,p))
-                p.wait.append(0)
-                remove.append(p)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} (tau {}ms) arrived; placed on ready queue'.format(clock, p.name,p.tau), queue)
-        for p in remove:
-            pre_arrival.remove(p)
-
-        # Doing switch out. If done, put a process into IO.
-        if switch_out:
-            preparation -= 1
-            if preparation == 0:
-                switch_out = False
-                if to_io != None:
-                    ios.append(to_io)
-                    ios.sort()
-                to_io = None
-
-        # If the CPU is idle and the queue is not empty, pop the queue and start
-        # switching in
-        if bursting == None and len(queue) != 0 and (not switch_out) and (not switch_in):
-            bursting = queue.pop()[1]
-            switch_in = True
-            preparation = tcs - 1
-
-        # For each process that's still in the queue, increment its wait time
-        # for metrics calculation
-        for p in queue:
-            p[1].wait[-1] += 1
-
-        # If there isn't a process anywhere, break the simulation, and directly
-        # add tcs to the clock to account for the final context switch
-        if len(pre_arrival) == 0 and len(ios) == 0 and bursting == None and len(queue) == 0 and to_io == None:
-            print('time {}ms: Simulator ended for SJF'.format(clock + tcs), queue,'\n')
-            break
-
-############################# metrics calculation ##############################
-
-    # Calculate average burst time
-    avg_burst = sum(burst_time) / len(burst_time)
-
-    # Calculate average wait time by appending all wait times from all processes
-    # together, then get the average
-    avg_wait = []
-    for p in processes:
-        avg_wait += p.wait
-    avg_wait = sum(avg_wait) / len(avg_wait)
-
-    # Create the metrics data. 
-    # Note that avg_turnaround = avg_burst + avg_wait + tcs * 2
-    # Here FCFS doesn't have preemptions.
-    data = 'Algorithm SJF\n' + \
-           '-- average CPU burst time: {:.3f} ms\n'.format(avg_burst) + \
-           '-- average wait time: {:.3f} ms\n'.format(avg_wait) + \
-           '-- average turnaround time: {:.3f} ms\n'.format(avg_burst + avg_wait + tcs * 2) + \
-           '-- total number of context switches: {}\n'.format(len(burst_time)) + \
-           '-- total number of preemptions: 0\n' + \
-           '-- CPU utilization: {:.3f}%\n'.format(sum(burst_time) / (clock + tcs) * 100)
-    simout.write(data)
-
-def SRT(processes, tcs, simout,lamb,alpha):
+    @param simout: the out file object, or None to not write the metrics
+    @param sink: the Sink that the events are emitted to
+    @param lamb: the lambda of the workload, the initial tau is 1 / lamb
+    @param alpha: constant for exponential averaging
+    @param log_level: the LogLevel of the event log
+    @param cpus: number of CPUs
+    @param per_cpu: whether every CPU has its own ready queue
+    @param summaries: whether to summarize every process in the metrics
+    @param profiler: the Profiler of the simulation loop, or None
+    @param checkpoint: the Checkpoint of the run, or None
+    @return metrics: dict of the metrics that are also written to simout
+    """
+    return run_policy(processes, SJFPolicy(lamb, alpha), tcs, simout, sink, log_level, cpus, per_cpu, summaries, profiler, checkpoint)
+
+def SRT(processes, tcs, simout, sink, lamb, alpha, log_level=LogLevel.TRUNCATED, cpus=1, per_cpu=False, summaries=False, profiler=None, checkpoint=None):
     """
     The SRT algorithm
     @param processes: list of processes to be scheduled
     @param tcs: time required to perform **HALF** context switches, i.e. time
     needed to for either switching in or switching out
-    @param simout: the out file object
-    """
-
-    # print all processes
-    for p in processes:
-        s = 's'
-        if p.num_bursts == 1:
-            s = ''
-        print('Process', p.name, '[NEW] (arrival time', p.arrival, 'ms)', p.num_bursts, 'CPU burst{} (tau {}ms)'.format(s,int(1/lamb)))
-
-########################## Variable Initialization #############################
-
-    # clock for counting time
-    clock = 0 
-
-    # queue of FCFS, could be changed to accommodate priority queue
-    queue = Queue('pq')
-
-    # List of processes before arrival
-    pre_arrival = [] 
-
-    # List of processes currently doing IO. Note that this list must be sorted
-    # at all times
-    ios = []
-
-    # Current bursting process. If the CPU is idle, this variable is set to None
-    bursting = None
-
-    # Indicates whether the CPU is doing the first half of the context switch
-    switch_in = False
-
-    # Indicates whether the CPU is doing the second half of the context switch
-    switch_out = False
-
-    # Preparation counter for context switch. If preparation == 0, context
-    # switch is done
-    preparation = tcs
-
-    # The process that's going to IO. After a process ends its CPU burst, it's
-    # "going" to IO, but it only actually goes to IO after the context switch
-    # is done
-    to_io = None
-
-    # List of burst times to calculate the metrics
-    burst_time = []
-    
-    burst_number = 0
-################################## Overhead ####################################
-
-    print('time 0ms: Simulator started for SRT', queue)
-
-    # Put all processes to either the queue (if arrival time is 0) or the
-    # pre_arrival list
-    for p in processes:
-        if p.arrival == 0:
-            p.tau=int(1/lamb)
-            queue.push((p.tau,p))
-            print('time {}ms: Process {} (tau {}ms) arrived; placed on ready queue'.format(clock, p.name,p.tau), queue)
-        else:
-            pre_arrival.append(p)
-    # Find the burst number in total
-    for p in processes:
-        burst_number += p.num_bursts
-    # Select a process to burst if the queue is not empty
-    if len(queue) != 0:
-        bursting = queue.pop()[1]
-        bursting.wait.append(0)
-        switch_in = True
-        preparation = tcs - 1
-
-################################# Simulation ###################################
-    preemption = 0
-
-    preempt_flag = False
-
-    finished_io = None
-    while (True):
-        """
-        The workflow:
-        1. taking out a process from bursting
-        2. add a new process to burst
-        3. check for any completed IO
-        4. check for any process arrival
-
-        For ties in any of the above events, break with names in alphabetical
-        order, i.e. Process A is should finish IO ahead of Process B
-        """
-        
-        # Increment time first
-        clock += 1
-        # Do a CPU burst
-        if bursting != None and (not switch_in):
-            bursting.timelist[0] -= 1
-            bursting.cpu_time += 1
-            burst_time[-1] += 1
-            
-            # If a process finished bursting, check if the process is
-            # terminating. If not, put it to IO. Also turns on context switches.
-            if bursting.timelist[0] == 0:
-                bursting.timelist.pop(0)
-                bursting.num_bursts -= 1
-                if bursting.num_bursts == 0:
-                    print('time {}ms: Process {} terminated'.format(clock, bursting.name), queue)
-                else:
-                    s = 's'
-                    if bursting.num_bursts == 1:
-                        s = ''
-                    new_tau=tau_function(bursting,alpha)
-                    if clock < 1000 or not __debug__:
-                        print('time {}ms: Process {} (tau {}ms) completed a CPU burst; {} burst{} to go'.format(clock, bursting.name, bursting.tau,bursting.num_bursts, s), queue)
-                        print('time {}ms: Recalculated tau ({}ms) for process {}'.format(clock,new_tau,bursting.name),queue)
-                        print('time {}ms: Process {} switching out of CPU; will block on I/O until time {}ms'.format(clock, bursting.name, clock + bursting.timelist[0] + tcs), queue)
-                    bursting.tau = new_tau
-                    to_io = bursting
-                switch_out = True
-                bursting.cpu_time=0
-                preparation = tcs + 1
-                bursting = None
-
-        # Doing context switch and if context switch done, put a process into
-        # bursting
-        if switch_in:
-            if preparation != 0:
-                preparation -= 1
-            else:
-                switch_in = False
-                burst_time.append(0)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} (tau {}ms) started using the CPU with {}ms burst remaining'.format(clock,bursting.name,bursting.tau, bursting.timelist[0]), queue)
-                if (finished_io):
-                    if (bursting.tau-bursting.cpu_time>finished_io.tau):
-                        if clock<1000 or not __debug__:
-                            print('time {}ms: Process {} (tau {}ms) will preempt {}'.format(clock,finished_io.name,finished_io.tau,bursting.name),queue)
-                        preemption +=1
-                        switch_out = True
-                        preparation = tcs + 1
-                        to_io=bursting
-                        preempt_flag = True
-                        bursting = None
-                finished_io = None
-        
-        #push the preempt process in
-        if switch_out:
-            if ((preparation-1)==0 and (preempt_flag)):
-                switch_out=False
-                preempt_flag=False
-                queue.push((to_io.tau-to_io.cpu_time,to_io))
-                to_io=None
-
-        # Do IO for each process and check if any process completed IO. Note
-        # that the IO list must always be in alphabetical order
-        remove = []
-        for p in ios:
-            p.timelist[0] -= 1
-            if p.timelist[0] == 0:
-                p.timelist.pop(0)
-                queue.push((p.tau,p))
-                p.wait.append(0)
-                remove.append(p)
-                if (not(bursting==None) and not switch_in):
-                    if (bursting.tau-bursting.cpu_time>p.tau):
-                        if clock<1000 or not __debug__:
-                            print('time {}ms: Process {} (tau {}ms) completed I/O; preempting {}'.format(clock,p.name,p.tau,bursting.name),queue)
-                        preemption +=1
-                        switch_out = True
-                        preparation = tcs + 1
-                        to_io=bursting
-                        preempt_flag = True
-                        bursting = None
-                    else:
-                        if clock < 1000 or not __debug__:
-                            print('time {}ms: Process {} (tau {}ms) completed I/O; placed on ready queue'.format(clock, p.name,p.tau), queue)
-                else:
-                    if (switch_in):
-                        finished_io = p
-                    if clock < 1000 or not __debug__:
-                        print('time {}ms: Process {} (tau {}ms) completed I/O; placed on ready queue'.format(clock, p.name,p.tau), queue)
-        for p in remove:
-            ios.remove(p)
-        ios.sort()
-
-        # Decrement arrival time and check if any process arrives
-        remove.clear()
-        for p in pre_arrival:
-            p.arrival -= 1
-            if p.arrival == 0:
-                p.tau=int(1/lamb)
-                queue.push((p.tau,p))
-                p.wait.append(0)
-                remove.append(p)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} (tau {}ms) arrived; placed on ready queue'.format(clock, p.name,p.tau), queue)
-        for p in remove:
-            pre_arrival.remove(p)
-
-        # Doing switch out. If done, put a process into IO.
-        if switch_out:
-            preparation -= 1
-            if preparation == 0:
-                switch_out = False
-                if to_io != None:
-                    ios.append(to_io)
-                    ios.sort()
-                to_io = None
-
-        # If the CPU is idle and the queue is not empty, pop the queue and start
-        # switching in
-        if bursting == None and len(queue) != 0 and (not switch_out) and (not switch_in):
-            bursting = queue.pop()[1]
-            switch_in = True
-            preparation = tcs - 1
-
-        # For each process that's still in the queue, increment its wait time
-        # for metrics calculation
-        for p in queue:
-            p[1].wait[-1] += 1
-
-        # If there isn't a process anywhere, break the simulation, and directly
-        # add tcs to the clock to account for the final context switch
-        if len(pre_arrival) == 0 and len(ios) == 0 and bursting == None and len(queue) == 0 and to_io == None:
-            print('time {}ms: Simulator ended for SRT'.format(clock + tcs), queue,'\n')
-            break
-
-############################# metrics calculation ##############################
-
-    # Calculate average burst time
-    avg_burst = sum(burst_time) / burst_number
-
-    # Calculate average wait time by appending all wait times from all processes
-    # together, then get the average
-    avg_wait = []
-    for p in processes:
-        avg_wait += p.wait
-    avg_wait = sum(avg_wait) / len(avg_wait)
-
-    # Create the metrics data. 
-    # Note that avg_turnaround = avg_burst + avg_wait + tcs * 2
-    # Here FCFS doesn't have preemptions.
-    data = 'Algorithm SRT\n' + \
-           '-- average CPU burst time: {:.3f} ms\n'.format(avg_burst) + \
-           '-- average wait time: {:.3f} ms\n'.format(avg_wait) + \
-           '-- average turnaround time: {:.3f} ms\n'.format(avg_burst + avg_wait + (len(burst_time))*tcs * 2/(burst_number)) + \
-           '-- total number of context switches: {}\n'.format(len(burst_time)) + \
-           '-- total number of preemptions: {}\n'.format(preemption) + \
-           '-- CPU utilization: {:.3f}%\n'.format(sum(burst_time) / (clock + tcs) * 100)
-    simout.write(data)
-
-
-def RR(processes, tcs, simout,tslice,rradd):
+    @param simout: the out file object, or None to not write the metrics
+    @param sink: the Sink that the events are emitted to
+    @param lamb: the lambda of the workload, the initial tau is 1 / lamb
+    @param alpha: constant for exponential averaging
+    @param log_level: the LogLevel of the event log
+    @param cpus: number of CPUs
+    @param per_cpu: whether every CPU has its own ready queue
+    @param summaries: whether to summarize every process in the metrics
+    @param profiler: the Profiler of the simulation loop, or None
+    @param checkpoint: the Checkpoint of the run, or None
+    @return metrics: dict of the metrics that are also written to simout
+    """
+    return run_policy(processes, SRTPolicy(lamb, alpha), tcs, simout, sink, log_level, cpus, per_cpu, summaries, profiler, checkpoint)
+
+def RR(processes, tcs, simout, sink, tslice, rradd, log_level=LogLevel.TRUNCATED, cpus=1, per_cpu=False, summaries=False, profiler=None, checkpoint=None):
     """
     The RR algorithm
     @param processes: list of processes to be scheduled
     @param tcs: time required to perform **HALF** context switches, i.e. time
     needed to for either switching in or switching out
-    @param simout: the out file object
-    """
-
-    # print all processes
-    for p in processes:
-        s = 's'
-        if p.num_bursts == 1:
-            s = ''
-        print('Process', p.name, '[NEW] (arrival time', p.arrival, 'ms)', p.num_bursts, 'CPU burst{}'.format(s))
-
-########################## Variable Initialization #############################
-
-    # clock for counting time
-    clock = 0 
-
-    # queue of RR, could be changed to accommodate priority queue
-    if (rradd==Precedence.END): queue = Queue()
-    else: queue=Queue('stack')
-
-    # List of processes before arrival
-    pre_arrival = [] 
-
-    # List of processes currently doing IO. Note that this list must be sorted
-    # at all times
-    ios = []
-
-    # Current bursting process. If the CPU is idle, this variable is set to None
-    bursting = None
-
-    # Indicates whether the CPU is doing the first half of the context switch
-    switch_in = False
-
-    # Indicates whether the CPU is doing the second half of the context switch
-    switch_out = False
-
-    # Preparation counter for context switch. If preparation == 0, context
-    # switch is done
-    preparation = tcs
-
-    # The process that's going to IO. After a process ends its CPU burst, it's
-    # "going" to IO, but it only actually goes to IO after the context switch
-    # is done
-    to_io = None
-
-    # List of burst times to calculate the metrics
-    burst_time = []
-
-    #number of preemption
-    preemption=0
-
-    #flag to determine whether exit normally or preempted
-
-    preempt_flag=False
-
-
-    burst_number=0
-
-    preced='END' if rradd==Precedence.END else 'BEGINNING'
-
-################################## Overhead ####################################
-
-    print('time 0ms: Simulator started for RR with time slice {}ms and rr_add to {}'.format(int(tslice),preced),queue)
-
-    # Put all processes to either the queue (if arrival time is 0) or the
-    # pre_arrival list
-    for p in processes:
-        if p.arrival == 0:
-            queue.push(p)
-            print('time {}ms: Process {} arrived; placed on ready queue'.format(clock, p.name), queue)
-        else:
-            pre_arrival.append(p)
-    # Find the burst number in total
-    for p in processes:
-        burst_number += p.num_bursts
-    # Select a process to burst if the queue is not empty
-    if len(queue) != 0:
-        bursting = queue.pop()
-        bursting.wait.append(0)
-        switch_in = True
-        preparation = tcs - 1
-
-################################# Simulation ###################################
-    #ts is use to keep track of tslice
-    ts=tslice
-
-    while (True):
-        """
-        The workflow:
-        1. taking out a process from bursting
-        2. add a new process to burst
-        3. check for any completed IO
-        4. check for any process arrival
-        For ties in any of the above events, break with names in alphabetical
-        order, i.e. Process A is should finish IO ahead of Process B
-        """
-        
-        # Increment time first
-        clock += 1
-        # Do a CPU burst
-        if bursting != None and (not switch_in):
-            bursting.timelist[0] -= 1
-            bursting.cpu_time += 1
-            burst_time[-1] += 1
-            ts-=1
-            # If a process finished bursting, check if the process is
-            # terminating. If not, put it to IO. Also turns on context switches.
-            if bursting.timelist[0] == 0:
-                bursting.timelist.pop(0)
-                bursting.num_bursts -= 1
-                if bursting.num_bursts == 0:
-                    print('time {}ms: Process {} terminated'.format(clock, bursting.name), queue)
-                else:
-                    s = 's'
-                    if bursting.num_bursts == 1:
-                        s = ''
-                    if clock < 1000 or not __debug__:
-                        print('time {}ms: Process {} completed a CPU burst; {} burst{} to go'.format(clock, bursting.name, bursting.num_bursts, s), queue)
-                        print('time {}ms: Process {} switching out of CPU; will block on I/O until time {}ms'.format(clock, bursting.name, clock + bursting.timelist[0] + tcs), queue)
-                    to_io = bursting
-                switch_out = True
-                bursting.cpu_time = 0
-                preparation = tcs + 1
-                bursting = None
-            elif ts==0 and len(queue):
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Time slice expired; process {} preempted with {}ms to go'.format(clock,bursting.name,bursting.timelist[0]),queue)
-                switch_out=True
-                preparation = tcs + 1
-                to_io=bursting
-                bursting=None
-                preemption += 1
-                preempt_flag=True
-            elif ts==0 and len(queue)==0:
-                ts=tslice
-
-        # Doing context switch and if context switch done, put a process into
-        # bursting
-        if switch_in:
-            if preparation != 0:
-                preparation -= 1
-            else:
-                switch_in = False
-                burst_time.append(0)
-                if clock < 1000 or not __debug__:
-                    if (bursting.cpu_time == 0):
-                        print('time {}ms: Process {} started using the CPU for {}ms burst'.format(clock, bursting.name, bursting.timelist[0]), queue)
-                    else:
-                        print('time {}ms: Process {} started using the CPU with {}ms burst remaining'.format(clock,bursting.name,bursting.timelist[0]),queue)
-        
-        #push the preempt process in
-        if switch_out:
-            if ((preparation-1)==0 and (preempt_flag)):
-                switch_out=False
-                preempt_flag=False
-                queue.push(to_io)
-                to_io=None
-                ts=tslice
-
-        # Do IO for each process and check if any process completed IO. Note
-        # that the IO list must always be in alphabetical order
-        remove = []
-        for p in ios:
-            p.timelist[0] -= 1
-            if p.timelist[0] == 0:
-                p.timelist.pop(0)
-                queue.push(p)
-                p.wait.append(0)
-                remove.append(p)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} completed I/O; placed on ready queue'.format(clock, p.name), queue)
-        for p in remove:
-            ios.remove(p)
-        ios.sort()
-
-        # Decrement arrival time and check if any process arrives
-        remove.clear()
-        for p in pre_arrival:
-            p.arrival -= 1
-            if p.arrival == 0:
-                queue.push(p)
-                p.wait.append(0)
-                remove.append(p)
-                if clock < 1000 or not __debug__:
-                    print('time {}ms: Process {} arrived; placed on ready queue'.format(clock, p.name), queue)
-        for p in remove:
-            pre_arrival.remove(p)
-
-        # Doing switch out. If done, put a process into IO.
-        if switch_out:
-            preparation -= 1
-            if preparation == 0:
-                switch_out = False
-                if to_io != None:
-                    ios.append(to_io)
-                    ios.sort()
-                to_io = None
-                ts=tslice
-
-        # If the CPU is idle and the queue is not empty, pop the queue and start
-        # switching in
-        if bursting == None and len(queue) != 0 and (not switch_out) and (not switch_in):
-            bursting = queue.pop()
-            switch_in = True
-            preparation = tcs - 1
-
-        # For each process that's still in the queue, increment its wait time
-        # for metrics calculation
-        for p in queue:
-            p.wait[-1] += 1
-
-        # If there isn't a process anywhere, break the simulation, and directly
-        # add tcs to the clock to account for the final context switch
-        if len(pre_arrival) == 0 and len(ios) == 0 and bursting == None and len(queue) == 0 and to_io == None:
-            print('time {}ms: Simulator ended for RR'.format(clock + tcs), queue)
-            break
-
-############################# metrics calculation ##############################
-
-    # Calculate average burst time
-
-    avg_burst = sum(burst_time) / burst_number
-
-    # Calculate average wait time by appending all wait times from all processes
-    # together, then get the average
-    avg_wait = []
-    for p in processes:
-        avg_wait += p.wait
-    avg_wait = sum(avg_wait) / len(avg_wait)
-
-    # Create the metrics data. 
-    # Note that avg_turnaround = avg_burst + avg_wait + tcs * 2
-    # Here FCFS doesn't have preemptions.
-    data = 'Algorithm RR\n' + \
-           '-- average CPU burst time: {:.3f} ms\n'.format(avg_burst) + \
-           '-- average wait time: {:.3f} ms\n'.format(avg_wait) + \
-           '-- average turnaround time: {:.3f} ms\n'.format(avg_burst + avg_wait + (len(burst_time))*tcs * 2/(burst_number)) + \
-           '-- total number of context switches: {}\n'.format(len(burst_time)) + \
-           '-- total number of preemptions: {}\n'.format(preemption) + \
-           '-- CPU utilization: {:.3f}%\n'.format(sum(burst_time) / (clock + tcs) * 100)
-    simout.write(data)
-
-def main(args):
-    
-    # 48-bit random number generator
-    rand = Rand48(args.seed, args.Lambda, args.max)
-
-    # Processes created using the random number generator
-    processes = create_processes(rand, args.n,1/args.Lambda)
-
-    # metrics out file
-    simout = open('simout.txt', 'w')
-
-    # Note that we use a copy of the processes generated, so we don't need to
-    # generate the processes again. We divide tcs by 2 to indicate half of the 
-    # context switch time
-    FCFS(copy.deepcopy(processes), args.tcs // 2, simout)
-    SJF(copy.deepcopy(processes), args.tcs // 2, simout,args.Lambda,args.alpha)
-    SRT(copy.deepcopy(processes),args.tcs // 2, simout, args.Lambda,args.alpha)
-    RR(copy.deepcopy(processes),args.tcs // 2, simout, args.tslice,args.rradd)
+    @param simout: the out file object, or None to not write the metrics
+    @param sink: the Sink that the events are emitted to
+    @param tslice: the time slice
+    @param rradd: the Precedence of processes added to the ready queue
+    @param log_level: the LogLevel of the event log
+    @param cpus: number of CPUs
+    @param per_cpu: whether every CPU has its own ready queue
+    @param summaries: whether to summarize every process in the metrics
+    @param profiler: the Profiler of the simulation loop, or None
+    @param checkpoint: the Checkpoint of the run, or None
+    @return metrics: dict of the metrics that are also written to simout
+    """
+    return run_policy(processes, RRPolicy(tslice, rradd.value), tcs, simout, sink, log_level, cpus, per_cpu, summaries, profiler, checkpoint)
+
+# The algorithms, in the order their results are reported
+ALGORITHMS = ['FCFS', 'SJF', 'SRT', 'RR']
+
+def run_algorithm(processes, algorithm, args, simout, sink, log_level, checkpoint=None):
+    """
+    A method to run one algorithm
+    @param processes: list of processes to be scheduled. They are modified by
+    the simulation
+    @param algorithm: name of the algorithm, one of ALGORITHMS
+    @param args: a NameSpace containing all argument values
+    @param simout: the out file object, or None to not write the metrics
+    @param sink: the Sink that the events are emitted to
+    @param log_level: the LogLevel of the event log
+    @param checkpoint: the Checkpoint of the run, or None
+    @return metrics: dict of the metrics of the algorithm
+    """
+    # We divide tcs by 2 to indicate half of the context switch time
+    per_cpu = args.queues == ReadyQueues.PER_CPU
+    profiler = Profiler() if args.profile else None
+    return run_policy(processes, create_policy(algorithm, args), args.tcs // 2, simout, sink, log_level, args.cpus, per_cpu,
+                      args.per_process, profiler, checkpoint)
+
+# The arguments that only change one algorithm. Configurations that only
+# differ in them are simulated as variants of the algorithm
+VARIANT_PARAMETERS = {'FCFS': [], 'SJF': ['alpha'], 'SRT': ['alpha'], 'RR': ['tslice']}
+
+def create_policy(algorithm, args, tau=None):
+    """
+    A method to create the policy of an algorithm
+    @param algorithm: name of the algorithm, one of ALGORITHMS
+    @param args: a NameSpace containing all argument values
+    @param tau: the initial tau of SJF and SRT instead of 1 / args.Lambda
+    @return policy: the Policy
+    """
+    if algorithm == 'FCFS':
+        return Policy()
+    elif algorithm == 'SJF':
+        return SJFPolicy(args.Lambda, args.alpha, tau)
+    elif algorithm == 'SRT':
+        return SRTPolicy(args.Lambda, args.alpha, tau)
+    elif algorithm == 'RR':
+        return RRPolicy(args.tslice, args.rradd.value)
+
+def run_variants(workload, algorithm, variants):
+    """
+    A method to run one algorithm for configurations that only differ in
+    VARIANT_PARAMETERS, without any event log. They are simulated once up to
+    the first event time where their parameters make a difference, and forked
+    from there, see schedule_variants
+    @param workload: the Workload, None for a CSV trace
+    @param algorithm: name of the algorithm, one of ALGORITHMS
+    @param variants: list of NameSpaces containing all argument values of
+    every configuration
+    @return metrics: list of the metrics of the algorithm for every
+    configuration
+    """
+    args = variants[0]
+    per_cpu = args.queues == ReadyQueues.PER_CPU
+
+    # Configurations with the same parameters for the algorithm share one
+    # simulation, e.g. all of them for FCFS
+    keys = [tuple(getattr(variant, name) for name in VARIANT_PARAMETERS[algorithm]) for variant in variants]
+    policies = {}
+    for key, variant in zip(keys, variants):
+        if key not in policies:
+            policies[key] = create_policy(algorithm, variant)
+    times = workload.times if workload is not None else None
+    metrics = schedule_variants(lambda: simulation_processes(args, workload), list(policies.values()), args.tcs // 2,
+                                args.cpus, per_cpu, args.per_process, times)
+    metrics = dict(zip(policies, metrics))
+    return [metrics[key] for key in keys]
+
+def simulation_processes(args, workload):
+    """
+    A method to get fresh processes for one simulation
+    @param args: a NameSpace containing all argument values
+    @param workload: the Workload, None for a CSV trace
+    @return processes: list of the processes of the workload, or a generator
+    streaming them from the trace
+    """
+    if workload is None:
+        return open_trace(args.trace, int(1/args.Lambda))
+    if args.trace:
+        return workload.stream()
+    return workload.processes()
+
+def generate_workload(args):
+    """
+    A method to generate the workload of the arguments with the random number
+    generator, or to map it from the workload cache or the trace
+    @param args: a NameSpace containing all argument values
+    @return workload: the Workload, the mapped one of a binary trace, or None
+    for a CSV trace, which is streamed again for every algorithm
+    """
+    if args.trace:
+        if args.trace.endswith('.csv'):
+            return None
+        return Workload.load(args.trace, int(1/args.Lambda))
+
+    def generate():
+        rand = Rand48(args.seed, args.Lambda, args.max)
+        return create_workload(rand, args.n, 1/args.Lambda, args.names)
+
+    if args.cache:
+        cache = WorkloadCache(args.cache, args.cache_size << 20)
+        key = (args.n, args.seed, args.Lambda, args.max, args.names.value)
+        return cache.get(key, int(1/args.Lambda), generate)
+    return generate()
+
+def run_profiled(processes, algorithm, args, sink, log_level, checkpoint=None):
+    """
+    A method to run one algorithm without writing simout, under cProfile if
+    the arguments ask for a dump of its stats
+    @param processes: list of processes to be scheduled
+    @param algorithm: name of the algorithm, one of ALGORITHMS
+    @param args: a NameSpace containing all argument values
+    @param sink: the Sink that the events are emitted to
+    @param log_level: the LogLevel of the event log
+    @param checkpoint: the Checkpoint of the run, or None
+    @return metrics: dict of the metrics of the algorithm
+    """
+    if not args.pstats:
+        return run_algorithm(processes, algorithm, args, None, sink, log_level, checkpoint)
+    profile = cProfile.Profile()
+    metrics = profile.runcall(run_algorithm, processes, algorithm, args, None, sink, log_level, checkpoint)
+    profile.dump_stats('{}-{}.pstats'.format(args.pstats, algorithm))
+    return metrics
+
+def write_metrics(simout, algorithm, metrics):
+    """
+    A method to write the metrics of an algorithm to simout, and its profile
+    to stderr if it was profiled
+    @param simout: the Simout
+    @param algorithm: name of the algorithm
+    @param metrics: dict of the metrics of the algorithm
+    """
+    simout.write(algorithm, metrics)
+    if 'profile' in metrics:
+        sys.stderr.write(metrics['profile'].report(algorithm))
+
+# The arguments that may change when a run is resumed, since they don't
+# change its results
+RESUMABLE = {'checkpoint', 'checkpoint_every', 'resume', 'profile', 'pstats', 'cache', 'cache_size'}
+
+def check_resume(args, snapshot_args):
+    """
+    A method to check that a run is resumed with the arguments it was started
+    with
+    @param args: a NameSpace containing all argument values
+    @param snapshot_args: a NameSpace containing all argument values of the
+    snapshot
+    """
+    for name, value in sorted(vars(snapshot_args).items()):
+        if name not in RESUMABLE and getattr(args, name, None) != value:
+            sys.exit('project.py: error: the snapshot was taken with {} {}, not {}'.format(name, value, getattr(args, name, None)))
+
+def run_worker(args, algorithm, log_level):
+    """
+    A method to run one algorithm in a worker process. The processes are
+    generated again from the seed, or read from the trace, instead of being
+    sent to the worker
+    @param args: a NameSpace containing all argument values
+    @param algorithm: name of the algorithm, one of ALGORITHMS
+    @param log_level: the LogLevel of the event log
+    @return events: list of the events emitted by the algorithm
+    @return metrics: dict of the metrics of the algorithm
+    """
+    workload = generate_workload(args)
+    sink = RecordingSink()
+    metrics = run_profiled(simulation_processes(args, workload), algorithm, args, sink, log_level)
+    return sink.events, metrics
+
+def main(args, sink=None, simout=None):
+    """
+    Run all four algorithms on the same processes
+    @param args: a NameSpace containing all argument values
+    @param sink: the Sink that the events are emitted to. If it's None, the
+    sink chosen by args.sink writing to stdout is used
+    @param simout: the Simout that the metrics are written to. If it's None,
+    the simout chosen by args.simout_format writing to its file is used
+    """
+
+    # Event log, nothing has to be formatted at all for a null sink
+    if sink is None:
+        sink = SINKS[args.sink]()
+    log_level = args.log_level
+    if isinstance(sink, NullSink):
+        log_level = LogLevel.NONE
+
+    # metrics out file, in the format of the arguments
+    if simout is None:
+        simout = SIMOUTS[args.simout_format]()
+
+    # The algorithms are independent, so with more than one job each of them
+    # runs in its own worker. Their events and metrics are put back together
+    # in the usual order
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(ALGORITHMS))) as pool:
+            futures = [pool.submit(run_worker, args, algorithm, log_level) for algorithm in ALGORITHMS]
+            for algorithm, future in zip(ALGORITHMS, futures):
+                events, metrics = future.result()
+                replay(events, sink)
+                write_metrics(simout, algorithm, metrics)
+        sink.close()
+        simout.close()
+        return
+
+    # Workload created using the 48-bit random number generator. A CSV trace
+    # is streamed again for every algorithm instead
+    workload = generate_workload(args)
+
+    # Snapshots of the run, and the snapshot it resumes from. Only the times
+    # of the workload are left out of them, they're the same in every run
+    checkpoint = None
+    times = workload.times if workload is not None else None
+    if args.checkpoint or args.resume:
+        checkpoint = Checkpoint(args.checkpoint or args.resume, args.checkpoint_every, args, sink, times)
+    if args.resume:
+        def resume_times(snapshot_args):
+            check_resume(args, snapshot_args)
+            return times
+        snapshot = load_snapshot(args.resume, resume_times)
+        checkpoint.resume(snapshot)
+        sys.stderr.write('resuming {} at time {}ms, the event log before it is the first {} characters of the interrupted one\n'.format(
+            snapshot['algorithm'], snapshot['state']['clock'], snapshot['emitted']))
+
+    # Note that every algorithm gets fresh processes of the same workload, so
+    # we don't need to generate the workload again
+    for algorithm in ALGORITHMS:
+        if checkpoint is not None:
+            # The algorithms done before the snapshot aren't simulated again
+            if algorithm in checkpoint.done:
+                write_metrics(simout, algorithm, checkpoint.done[algorithm])
+                continue
+            checkpoint.start(algorithm)
+        metrics = run_profiled(simulation_processes(args, workload), algorithm, args, sink, log_level, checkpoint)
+        write_metrics(simout, algorithm, metrics)
+        if checkpoint is not None:
+            checkpoint.finish(algorithm, metrics)
+    sink.close()
+    simout.close()
+    if checkpoint is not None:
+        checkpoint.remove()
 
 if __name__ == '__main__':
-    main(parsing())
\ No newline at end of file
+    main(parsing())
@@ -0,0 +1,187 @@
+from project import LogLevel, create_workload_batched, create_workload_scalar, main, parsing
+from Rand48 import Rand48, numpy
+from Simout import SIMOUTS
+from Sink import SINKS
+from sweep import split_config
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import difflib
+import io
+import os
+import sys
+import time
+
+# The workloads that are generated both in blocks and one number at a time,
+# which must be the same: (n, seed, Lambda, max). There's a negative seed, and
+# one that doesn't fit in 48 bits
+GENERATION_CASES = [(50, 2, 0.01, 256), (50, 7, 0.001, 3000), (50, -5, 0.01, 256), (50, 1 << 50, 0.001, 3000)]
+
+def normalize(data):
+    """
+    A method to normalize an output for comparison. The goldens may be UTF-16
+    with a byte order mark and CRLF line ends, e.g. when they were redirected
+    in PowerShell, and trailing whitespace doesn't count
+    @param data: the output, bytes or str
+    @return text: the normalized text, lines ending in LF
+    """
+    if isinstance(data, bytes):
+        if data[:2] in (b'\xff\xfe', b'\xfe\xff'):
+            data = data.decode('utf-16', errors='replace')
+        else:
+            data = data.decode('utf-8-sig', errors='replace')
+    lines = [line.rstrip() for line in data.replace('\r\n', '\n').split('\n')]
+    return '\n'.join(lines).rstrip('\n') + '\n'
+
+def simout_golden(path):
+    """
+    A method to get the golden simout of a golden output, e.g.
+    simout02-full.txt for output02-full.txt
+    @param path: path of the golden output
+    @return path: path of the golden simout
+    """
+    directory, name = os.path.split(path)
+    if name.startswith('output'):
+        return os.path.join(directory, 'simout' + name[len('output'):])
+    return os.path.join(directory, 'simout-' + name)
+
+def read_cases(path):
+    """
+    A method to read the cases from a file of commands like all_tests.txt.
+    Only the commands whose output is redirected to a golden are cases
+    @param path: path of the file
+    @return cases: list of dicts of the arguments, the log level and the
+    paths of the golden output and simout of every case
+    """
+    cases = []
+    directory = os.path.dirname(os.path.abspath(path))
+    with open(path) as f:
+        for line in f:
+            interpreter, argv, output = split_config(line)
+            if argv is None or output is None:
+                continue
+
+            # The log level the golden was written with: full when optimized,
+            # unless it's given
+            log_level = LogLevel.FULL if '-O' in interpreter else LogLevel.TRUNCATED
+            golden = os.path.join(directory, output)
+            cases.append({'argv': argv, 'log_level': log_level, 'stdout': golden, 'simout': simout_golden(golden)})
+    return cases
+
+def run_case(case):
+    """
+    A method to run a case in this process, with its event log and metrics
+    written to memory instead of stdout and simout
+    @param case: dict of the case, see read_cases
+    @return stdout: the event log
+    @return simout: the metrics
+    @return seconds: time taken
+    """
+    start = time.perf_counter()
+    args = parsing(case['argv'])
+    if '--log-level' not in case['argv']:
+        args.log_level = case['log_level']
+    stdout = io.StringIO()
+    simout = io.StringIO()
+    main(args, SINKS[args.sink](stdout), SIMOUTS[args.simout_format](simout))
+    return stdout.getvalue(), simout.getvalue(), time.perf_counter() - start
+
+def compare(path, actual, update, diff_lines):
+    """
+    A method to compare an output with its golden
+    @param path: path of the golden
+    @param actual: the output
+    @param update: whether to write the output as the golden if it differs or
+    doesn't exist
+    @param diff_lines: maximal number of lines of the diff to return
+    @return ok: whether the output matches the golden, or it was updated
+    @return report: the diff, or why there isn't one
+    """
+    actual = normalize(actual)
+    expected = None
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            expected = normalize(f.read())
+    if expected == actual:
+        return True, ''
+    if update:
+        with open(path, 'w', newline='\n') as f:
+            f.write(actual)
+        return True, 'updated {}'.format(path)
+    if expected is None:
+        return False, 'missing golden {}, run with --update to write it'.format(path)
+    diff = list(difflib.unified_diff(expected.splitlines(), actual.splitlines(), path, 'actual', lineterm=''))
+    if len(diff) > diff_lines:
+        diff = diff[:diff_lines] + ['... {} more lines'.format(len(diff) - diff_lines)]
+    return False, '\n'.join(diff)
+
+def check_generation(case):
+    """
+    A method to check that a workload generated in blocks with NumPy is the
+    one generated one number at a time, and that both leave the generator in
+    the same state
+    @param case: tuple of n, seed, Lambda and max
+    @return ok: whether they are the same
+    """
+    n, seed, Lambda, max = case
+    workloads = []
+    for create in (create_workload_scalar, create_workload_batched):
+        rand = Rand48(seed, Lambda, max)
+        workload = create(rand, n, 1 / Lambda)
+        workloads.append((workload.names, list(workload.arrivals), list(workload.num_bursts), list(workload.times),
+                          list(workload.offsets), rand.X, rand.position))
+    return workloads[0] == workloads[1]
+
+def regress_parsing():
+    """
+    A method to parse all arguments of the regression runner
+    @return args: a NameSpace containing all argument values
+    """
+    parser = argparse.ArgumentParser(description='golden output regression test. Every command of the file whose output is redirected is run in-process and its event log and simout are compared with the goldens, e.g. output02-full.txt and simout02-full.txt')
+    parser.add_argument('tests', nargs='?', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'all_tests.txt'), help='file of commands. The default is all_tests.txt')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='number of worker processes. The default is the number of CPUs')
+    parser.add_argument('--update', action='store_true', help='write the outputs that differ or have no golden as the new goldens')
+    parser.add_argument('--diff-lines', type=int, default=40, help='maximal number of lines of every diff shown. The default is 40')
+    return parser.parse_args()
+
+def regress(args):
+    """
+    Run every case in a pool of workers and compare the outputs with the
+    goldens, then check the generation of the workload in blocks
+    @param args: a NameSpace containing all argument values of the runner
+    @return failures: number of cases that don't match their goldens, and of
+    workloads generated in blocks that differ from the ones generated one
+    number at a time
+    """
+    cases = read_cases(args.tests)
+    failures = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(cases)))) as pool:
+        for case, (stdout, simout, seconds) in zip(cases, pool.map(run_case, cases)):
+            reports = []
+            ok = True
+            for path, actual in ((case['stdout'], stdout), (case['simout'], simout)):
+                matched, report = compare(path, actual, args.update, args.diff_lines)
+                ok = ok and matched
+                if report:
+                    reports.append(report)
+            failures += not ok
+            print('{} {} ({:.2f}s)'.format('PASS' if ok else 'FAIL', os.path.basename(case['stdout']), seconds))
+            for report in reports:
+                print(report)
+
+    # The generation of the workload, which the goldens only cover for their
+    # seeds
+    checks = len(cases)
+    if numpy is None:
+        print('SKIP generation in blocks, NumPy is not installed')
+    else:
+        for case in GENERATION_CASES:
+            ok = check_generation(case)
+            failures += not ok
+            checks += 1
+            print('{} generation n={} seed={} Lambda={} max={}'.format('PASS' if ok else 'FAIL', *case))
+    print('{} passed, {} failed in {:.2f}s'.format(checks - failures, failures, time.perf_counter() - start))
+    return failures
+
+if __name__ == '__main__':
+    sys.exit(1 if regress(regress_parsing()) else 0)
@@ -0,0 +1,344 @@
+from project import ALGORITHMS, RESUMABLE, LogLevel, generate_workload, parsing, run_algorithm, simulation_processes
+from Simout import metrics_record
+from Sink import NullSink
+from sweep import PARAMETERS
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import re
+import shlex
+import sys
+import time
+
+# The options of project.py a request may give. The others write files or
+# only change the event log, which the service doesn't produce. The workload
+# cache is the one of the service, and a trace has to be in its directory of
+# traces, see serve_parsing
+OPTIONS = {'trace', 'names', 'per_process', 'cpus', 'queues'}
+
+# A word that argparse takes as a negative number rather than an option
+NEGATIVE_NUMBER = re.compile(r'-\d+|-\d*\.\d+')
+
+# The arguments that don't change the results, so they aren't part of the
+# key of a result
+UNKEYED = RESUMABLE | {'sink', 'log_level', 'jobs', 'simout_format'}
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 20
+
+# The reason phrases of the statuses the service answers with
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+# Workloads generated by a worker, the most recently used last, and how many
+# of them it keeps
+WORKLOADS = OrderedDict()
+WORKLOADS_KEPT = 4
+
+def worker_workload(args):
+    """
+    A method to get the workload of the arguments in a worker. The last few
+    generated workloads are kept, so what-if queries that only change the
+    scheduler parameters don't generate the same workload again
+    @param args: a NameSpace containing all argument values
+    @return workload: the Workload, or None for a CSV trace
+    """
+    if args.trace:
+        return generate_workload(args)
+    key = (args.n, args.seed, args.Lambda, args.max, args.names)
+    if key in WORKLOADS:
+        WORKLOADS.move_to_end(key)
+    else:
+        WORKLOADS[key] = generate_workload(args)
+        if len(WORKLOADS) > WORKLOADS_KEPT:
+            WORKLOADS.popitem(last=False)
+    return WORKLOADS[key]
+
+def simulate_config(argv):
+    """
+    A method to simulate a configuration with all algorithms, without any
+    event log. It runs in a worker process
+    @param argv: the arguments of the configuration, as for project.py
+    @return records: list of the metrics of every algorithm, as written to a
+    JSON simout
+    """
+    args = parsing(argv)
+    workload = worker_workload(args)
+    records = []
+    for algorithm in ALGORITHMS:
+        metrics = run_algorithm(simulation_processes(args, workload), algorithm, args, None, NullSink(), LogLevel.NONE)
+        records.append(metrics_record(algorithm, metrics))
+    return records
+
+def request_argv(request):
+    """
+    A method to get the arguments of project.py of a request. A request is a
+    JSON object of the parameters and options, e.g. {"n": 8, "seed": 2,
+    "Lambda": 0.01, "max": 256, "tcs": 4, "alpha": 0.5, "tslice": 128,
+    "cpus": 2}, or of the command line, e.g.
+    {"args": "8 2 0.01 256 4 0.5 128 --cpus 2"}
+    @param request: the decoded request
+    @return argv: list of the arguments
+    """
+    if not isinstance(request, dict):
+        raise ValueError('a request must be a JSON object')
+    if 'args' in request:
+        args = request['args']
+        return shlex.split(args) if isinstance(args, str) else [str(arg) for arg in args]
+
+    # The parameters are positional, only rradd may be left out
+    argv = []
+    for parameter in PARAMETERS:
+        if parameter in request:
+            argv.append(str(request[parameter]))
+        elif parameter != 'rradd':
+            raise ValueError('missing parameter {}'.format(parameter))
+    for name, value in request.items():
+        if name in PARAMETERS:
+            continue
+        option = '--' + name.replace('_', '-')
+        if value is True:
+            argv.append(option)
+        elif value is not False and value is not None:
+            argv += [option, str(value)]
+    return argv
+
+def parse_request(request, traces=None):
+    """
+    A method to check the arguments of a request and get the key of its result
+    @param request: the decoded request
+    @param traces: the directory of the traces a request may give, by their
+    path in it, or None if it may not give one
+    @return argv: list of the arguments, as for project.py
+    @return key: tuple of every argument value that changes the results
+    """
+    # Any other option is refused, e.g. -h, which would print the help to the
+    # stdout of the service
+    argv = request_argv(request)
+    for word in argv:
+        if not word.startswith('-') or NEGATIVE_NUMBER.fullmatch(word):
+            continue
+        if not word.startswith('--') or word[2:].split('=')[0].replace('-', '_') not in OPTIONS:
+            raise ValueError('option {} is not allowed, the options are {}'.format(
+                word, ', '.join('--' + option.replace('_', '-') for option in sorted(OPTIONS))))
+
+    # A bad argument is reported the way project.py reports it
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            args = parsing(argv)
+    except SystemExit:
+        lines = stderr.getvalue().strip().splitlines()
+        raise ValueError(lines[-1].split('error: ', 1)[-1] if lines else 'bad arguments')
+
+    # A trace is looked up in the directory of traces, and any other file is
+    # reported the same way as a missing one, so a request can't tell whether
+    # it exists. The worker is given the resolved path, which overrides the
+    # one of the request
+    stat = None
+    if args.trace:
+        error = ValueError('no trace {} among the traces of the service'.format(args.trace))
+        if traces is None:
+            raise error
+        directory = os.path.realpath(traces)
+        path = os.path.realpath(os.path.join(directory, args.trace))
+        if os.path.commonpath([directory, path]) != directory or not os.path.isfile(path):
+            raise error
+        stat = os.stat(path)
+        args.trace = path
+        argv = argv + ['--trace', path]
+
+    key = tuple(sorted((name, value) for name, value in vars(args).items() if name not in UNKEYED))
+
+    # A trace may change between requests
+    if stat is not None:
+        key += (stat.st_mtime_ns, stat.st_size)
+    return argv, key
+
+class Service():
+    """
+    A Service class that simulates the configurations of requests on a pool of
+    workers. Results are kept in an LRU cache by the key of their arguments,
+    and concurrent requests with the same key share one simulation
+    """
+
+    def __init__(self, pool, size, options=(), traces=None):
+        """
+        @param pool: the ProcessPoolExecutor that runs the simulations
+        @param size: number of results kept in the cache
+        @param options: arguments of project.py added to every simulation,
+        e.g. the workload cache of the service
+        @param traces: the directory of the traces requests may give, or None
+        if they may not give one
+        """
+        self.pool = pool
+        self.size = size
+        self.options = list(options)
+        self.traces = traces
+
+        # The cached results, the most recently used last, and the
+        # simulations running, by key
+        self.results = OrderedDict()
+        self.running = {}
+
+        # Number of requests answered from the cache, simulated, and sharing
+        # the simulation of another request
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def simulate(self, request):
+        """
+        A method to get the results of a request
+        @param request: the decoded request
+        @return records: list of the metrics of every algorithm
+        @return source: 'cache', 'simulated' or 'coalesced'
+        """
+        argv, key = parse_request(request, self.traces)
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key], 'cache'
+        if key in self.running:
+            self.coalesced += 1
+            source = 'coalesced'
+        else:
+            self.misses += 1
+            source = 'simulated'
+            future = asyncio.get_running_loop().run_in_executor(self.pool, simulate_config, argv + self.options)
+            future.add_done_callback(lambda future: self.finish(key, future))
+            self.running[key] = future
+
+        # The simulation goes on if a client disconnects, the others may be
+        # waiting for it too
+        return await asyncio.shield(self.running[key]), source
+
+    def finish(self, key, future):
+        """
+        A method to cache the results of a simulation once it's done
+        @param key: the key of the results
+        @param future: the Future of the simulation
+        """
+        del self.running[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.results[key] = future.result()
+        if len(self.results) > self.size:
+            self.results.popitem(last=False)
+
+    def stats(self):
+        """
+        A method to get the counters of the service
+        @return stats: dict of the counters
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'coalesced': self.coalesced,
+                'cached': len(self.results), 'running': len(self.running)}
+
+    async def route(self, method, path, body):
+        """
+        A method to answer a request
+        @param method: the HTTP method
+        @param path: the path, without any query
+        @param body: the body, bytes
+        @return status: the HTTP status
+        @return response: the response, to be dumped as JSON
+        """
+        if path == '/simulate':
+            if method != 'POST':
+                return 405, {'error': 'POST a configuration to /simulate'}
+            start = time.perf_counter()
+            try:
+                records, source = await self.simulate(json.loads(body or b'{}'))
+            except ValueError as error:
+                return 400, {'error': str(error)}
+            except Exception as error:
+                return 500, {'error': '{}: {}'.format(type(error).__name__, error)}
+            return 200, {'source': source, 'seconds': time.perf_counter() - start, 'results': records}
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {'error': 'GET /stats'}
+            return 200, self.stats()
+        return 404, {'error': 'no such path {}, the paths are /simulate and /stats'.format(path)}
+
+    async def handle(self, reader, writer):
+        """
+        A method to serve one connection. It's kept alive for more requests
+        unless the client closes it
+        @param reader: the StreamReader of the connection
+        @param writer: the StreamWriter of the connection
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep = len(words) == 3 and words[2] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                length = int(headers.get('content-length', 0) or 0)
+                if len(words) != 3:
+                    status, response = 400, {'error': 'bad request line'}
+                elif length > MAX_BODY:
+                    status, response = 413, {'error': 'the body is larger than {} bytes'.format(MAX_BODY)}
+                    keep = False
+                else:
+                    body = await reader.readexactly(length)
+                    status, response = await self.route(words[0], words[1].split('?')[0], body)
+
+                data = json.dumps(response).encode()
+                writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: {}\r\n\r\n'.format(
+                    status, REASONS[status], len(data), 'keep-alive' if keep else 'close').encode('latin-1') + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+def serve_parsing():
+    """
+    A method to parse all arguments of the service
+    @return args: a NameSpace containing all argument values
+    """
+    parser = argparse.ArgumentParser(description='opsys simulation service. POST a configuration as JSON to /simulate, e.g. {"n": 8, "seed": 2, "Lambda": 0.01, "max": 256, "tcs": 4, "alpha": 0.5, "tslice": 128} or {"args": "8 2 0.01 256 4 0.5 128 --cpus 2"}, to get the metrics of every algorithm as they are written to simout.jsonl. GET /stats for the counters of the cache')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on. The default is localhost only')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on. The default is 8000')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='number of worker processes. The default is the number of CPUs')
+    parser.add_argument('--results', type=int, default=1024, help='number of results kept in the LRU cache. The default is 1024')
+    parser.add_argument('--cache', help='directory of a cache of generated workloads, shared by all workers, so workloads are mapped from it instead of being generated')
+    parser.add_argument('--traces', help='directory of the traces requests may simulate, given by their path in it. Without it, requests can\'t give a trace')
+    parser.add_argument('--cache-size', default='1024', help='size bound of the workload cache in MB. The default is 1024')
+    return parser.parse_args()
+
+async def serve(args):
+    """
+    Serve requests until interrupted
+    @param args: a NameSpace containing all argument values of the service
+    """
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        # Every simulation uses the workload cache of the service, if any
+        options = ['--cache', args.cache, '--cache-size', args.cache_size] if args.cache else []
+        service = Service(pool, args.results, options, args.traces)
+        server = await asyncio.start_server(service.handle, args.host, args.port)
+        sys.stderr.write('serving on http://{}:{}\n'.format(args.host, args.port))
+        async with server:
+            await server.serve_forever()
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(serve(serve_parsing()))
+    except KeyboardInterrupt:
+        pass
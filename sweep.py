@@ -0,0 +1,165 @@
+from project import ALGORITHMS, VARIANT_PARAMETERS, generate_workload, parsing, run_variants
+from Simout import METRICS
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import csv
+import itertools
+import os
+import shlex
+import sys
+
+# The simulation parameters of a configuration, in the order project.py takes
+# them on the command line
+PARAMETERS = ['n', 'seed', 'Lambda', 'max', 'tcs', 'alpha', 'tslice', 'rradd']
+
+def sweep_parsing():
+    """
+    A method to parse all arguments of the sweep
+    @return args: a NameSpace containing all argument values
+    """
+    parser = argparse.ArgumentParser(description='opsys simulation parameter sweep. Every combination of the given values is simulated, or every configuration listed in --configs')
+    parser.add_argument('--configs', help='file with one configuration per line, given as the arguments of project.py. Lines like "python project.py 1 2 0.01 256 4 0.5 128 > out.txt" (see all_tests.txt) are accepted too')
+    parser.add_argument('--n', nargs='+', default=['1'], help='numbers of processes')
+    parser.add_argument('--seed', nargs='+', default=['2'], help='seeds for the random number generator')
+    parser.add_argument('--Lambda', nargs='+', default=['0.01'], help='inverses of the average of the exponential distribution')
+    parser.add_argument('--max', nargs='+', default=['256'], help='upper bounds for random numbers')
+    parser.add_argument('--tcs', nargs='+', default=['4'], help='times required for context switch')
+    parser.add_argument('--alpha', nargs='+', default=['0.5'], help='constants for exponential averaging for SJF & SRT')
+    parser.add_argument('--tslice', nargs='+', default=['128'], help='time slices for RR')
+    parser.add_argument('--rradd', nargs='+', default=['END'], help='END and/or BEGINNING for RR')
+    parser.add_argument('--cache', help='directory of a cache of generated workloads, shared by all workers, so configurations that only change scheduler parameters map the workload instead of generating it')
+    parser.add_argument('--cache-size', default='1024', help='size bound of the workload cache in MB. The default is 1024')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='number of worker processes. The default is the number of CPUs')
+    parser.add_argument('--no-fork', action='store_true', help='simulate every configuration on its own. By default, configurations that only differ in alpha and tslice are simulated together in one worker, once up to where they first act differently. This may be faster when there are fewer such groups than jobs')
+    parser.add_argument('-o', '--output', default='-', help='CSV file to write the results to. The default is stdout')
+    return parser.parse_args()
+
+def split_config(line):
+    """
+    A method to split a configuration line, e.g.
+    "python project.py 1 2 0.01 256 4 0.5 128 > out.txt"
+    @param line: the line
+    @return interpreter: the words before the arguments, e.g. ['python',
+    'project.py'], empty if the line only has the arguments
+    @return argv: the arguments of project.py, None for an empty line
+    @return output: the file the output is redirected to, or None
+    """
+    words = shlex.split(line, comments=True)
+    if not words:
+        return [], None, None
+
+    # Split off the interpreter and script, and any redirection of the output
+    interpreter = []
+    for i, word in enumerate(words):
+        if word.endswith('project.py'):
+            interpreter, words = words[:i + 1], words[i + 1:]
+            break
+    output = None
+    if '>' in words:
+        i = words.index('>')
+        words, output = words[:i], ' '.join(words[i + 1:]) or None
+    return interpreter, words, output
+
+def read_configs(path):
+    """
+    A method to read the configurations from a file
+    @param path: path of the file
+    @return configs: list of the argument lists of every configuration
+    """
+    configs = []
+    with open(path) as f:
+        for line in f:
+            interpreter, argv, output = split_config(line)
+            if argv is not None:
+                configs.append(argv)
+    return configs
+
+def grid_configs(args):
+    """
+    A method to build the configurations of a grid, i.e. every combination of
+    the given parameter values
+    @param args: a NameSpace containing all argument values of the sweep
+    @return configs: list of the argument lists of every configuration
+    """
+    values = [getattr(args, parameter) for parameter in PARAMETERS]
+    return [list(config) for config in itertools.product(*values)]
+
+def group_configs(configs, fork=True):
+    """
+    A method to group the configurations that only differ in the parameters
+    of single algorithms, i.e. alpha and tslice, so they are simulated
+    together
+    @param configs: list of the argument lists of every configuration
+    @param fork: whether to group them, otherwise every group has one
+    configuration
+    @return groups: list of the lists of the indices of the configurations of
+    every group, in the order of their first configurations
+    """
+    if not fork:
+        return [[i] for i in range(len(configs))]
+    forked = {name for names in VARIANT_PARAMETERS.values() for name in names}
+    groups = {}
+    for i, config in enumerate(configs):
+        key = tuple(sorted((name, value) for name, value in vars(parsing(config)).items() if name not in forked))
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+def run_group(argvs):
+    """
+    A method to simulate a group of configurations with all algorithms,
+    without any event log. The workload is generated once, and every
+    algorithm is forked where the parameters of the configurations first make
+    a difference, see run_variants. It runs in a worker process, which is
+    reused for many groups
+    @param argvs: list of the arguments of every configuration, as for
+    project.py
+    @return rows: list of the rows of every configuration, i.e. one dict per
+    algorithm with the parameters and the metrics
+    """
+    variants = [parsing(argv) for argv in argvs]
+    workload = generate_workload(variants[0])
+    rows = [[] for variant in variants]
+    for algorithm in ALGORITHMS:
+        for args, config_rows, metrics in zip(variants, rows, run_variants(workload, algorithm, variants)):
+            row = {parameter: getattr(args, parameter) for parameter in PARAMETERS}
+            row['rradd'] = args.rradd.value
+            row['algorithm'] = algorithm
+            row.update(metrics)
+            config_rows.append(row)
+    return rows
+
+def main(args):
+    """
+    Simulate every configuration in a pool of workers and write one CSV row per
+    configuration and algorithm, in the order of the configurations
+    @param args: a NameSpace containing all argument values of the sweep
+    """
+    configs = read_configs(args.configs) if args.configs else grid_configs(args)
+    if args.cache:
+        configs = [config + ['--cache', args.cache, '--cache-size', args.cache_size] for config in configs]
+
+    # Check every configuration up front, so a typo doesn't show up only after
+    # the sweep has been running for a while
+    for config in configs:
+        parsing(config)
+    groups = group_configs(configs, not args.no_fork)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    writer = csv.DictWriter(output, fieldnames=PARAMETERS + ['algorithm'] + METRICS, extrasaction='ignore')
+    writer.writeheader()
+    # The rows of a group are written once the configurations before them
+    # are written
+    done = {}
+    written = 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        tasks = [[configs[i] for i in group] for group in groups]
+        for group, rows in zip(groups, pool.map(run_group, tasks, chunksize=max(1, len(groups) // (4 * args.jobs)))):
+            done.update(zip(group, rows))
+            while written in done:
+                writer.writerows(done.pop(written))
+                written += 1
+    if output is not sys.stdout:
+        output.close()
+
+if __name__ == '__main__':
+    main(sweep_parsing())